@@ -0,0 +1,80 @@
+"""
+Measure the latency of `add` and `update` of transactions, with their running totals triggers,
+under each connection profile.
+
+Run from the project directory: python -m benchmarks.connection_profiles --count 500
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from xpense.database.connection import ConnectionProfile, DEFAULT_PROFILE, WAL_PROFILE
+from xpense.database.running_totals import RunningTotals
+from xpense.database.sqlite_repository import BaseRepository
+from xpense.types import Transaction, TransactionTotal, TransactionType
+
+PROFILES: Dict[str, ConnectionProfile] = {
+    "default": DEFAULT_PROFILE,
+    "wal": WAL_PROFILE,
+}
+
+
+def get_random_transaction(index: int) -> Transaction:
+    return Transaction(
+        type=random.choice(list(TransactionType)),
+        amount=round(random.uniform(1, 500), 2),
+        category=random.choice(["food", "rent", "transport", "salary"]),
+        date=datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=index),
+    )
+
+
+def format_latencies(name: str, latencies: List[float]) -> str:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    return f"{name:<8} median {statistics.median(latencies_ms):8.3f} ms   p95 {p95:8.3f} ms"
+
+
+def benchmark_profile(profile: ConnectionProfile, db_file: str, count: int) -> Dict[str, List[float]]:
+    transactions = BaseRepository(Transaction, db_file, connection_profile=profile)
+    RunningTotals(transactions, BaseRepository(TransactionTotal, db_file, connection_profile=profile))
+
+    latencies = {"add": [], "update": []}
+    added_transactions = []
+    for index in range(count):
+        transaction = get_random_transaction(index)
+        start = time.perf_counter()
+        transactions.add(transaction)
+        latencies["add"].append(time.perf_counter() - start)
+        added_transactions.append(transaction)
+
+    for transaction in added_transactions:
+        transaction.amount = round(random.uniform(1, 500), 2)
+        start = time.perf_counter()
+        transactions.update(transaction)
+        latencies["update"].append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark add and update latency per connection profile.")
+    parser.add_argument("--count", type=int, default=500, help="Number of transactions added, then updated.")
+    parser.add_argument(
+        "--dir", default=None, help="Directory of the benchmark databases, on the disk to measure. Default: temp."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for profile_name, profile in PROFILES.items():
+            latencies = benchmark_profile(profile, os.path.join(directory, f"{profile_name}.db"), args.count)
+            print(f"Profile '{profile_name}': {profile}")
+            for operation, operation_latencies in latencies.items():
+                print("    " + format_latencies(operation, operation_latencies))
+
+
+if __name__ == "__main__":
+    main()
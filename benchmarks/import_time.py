@@ -0,0 +1,122 @@
+"""
+Check the import time of the app entry point against the budget in `import_time_budget.json`,
+measured with `python -X importtime`, so that startup regressions fail instead of going unnoticed.
+
+Absolute times depend on the machine, so every limit is a ratio to a reference import measured in the
+same run: the import of the app dependencies alone, `reference_modules` in the budget. Two times are
+limited: the total import time of the entry point, which catches new or heavier imports, and the time
+spent in the project modules themselves, which catches slow module level code.
+
+Run from the project directory, with the locked dependencies installed: python -m benchmarks.import_time
+Exits with status 1 when over budget. After an intended change, `--update` rewrites the budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time_budget.json")
+ENTRY_POINT = "main"
+PROJECT_PACKAGES = ("main", "xpense")
+BUDGET_HEADROOM = 1.5
+
+
+def measure_import_times(modules: Tuple[str, ...]) -> Dict[str, Dict[str, int]]:
+    """Import the modules in a fresh interpreter, return the self and cumulative microseconds per imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        import_times[name.strip()] = {"self": int(self_us), "cumulative": int(cumulative_us)}
+    return import_times
+
+
+def is_project_module(name: str) -> bool:
+    return any(name == package or name.startswith(f"{package}.") for package in PROJECT_PACKAGES)
+
+
+def get_project_self_us(import_times: Dict[str, Dict[str, int]]) -> int:
+    return sum(times["self"] for name, times in import_times.items() if is_project_module(name))
+
+
+def summarize(
+        runs: List[Dict[str, Dict[str, int]]],
+        reference_runs: List[Dict[str, Dict[str, int]]],
+        reference_modules: Tuple[str, ...],
+) -> Dict[str, float]:
+    """
+    Median, over the runs, of the entry point import time and of the time spent in the project modules
+    themselves, each as a ratio to the reference import measured just before it.
+    """
+    ratios = {"total_us": [], "project_self_us": []}
+    for run, reference_run in zip(runs, reference_runs):
+        reference_us = sum(reference_run[module]["cumulative"] for module in reference_modules)
+        ratios["total_us"].append(run[ENTRY_POINT]["cumulative"] / reference_us)
+        ratios["project_self_us"].append(get_project_self_us(run) / reference_us)
+    return {name: statistics.median(values) for name, values in ratios.items()}
+
+
+def check_budget(budget: dict, ratios: Dict[str, float], imported_modules: List[str]) -> List[str]:
+    """Return the budget violations: times over their limit, and deferred modules imported at startup."""
+    violations = [
+        f"{name}: {ratios[name]:.3f} x the reference import, over the budget of {limit} x"
+        for name, limit in budget.get("max_reference_ratio", {}).items()
+        if ratios[name] > limit
+    ]
+    violations.extend(
+        f"{module}: imported at startup, but it should be deferred until its view is shown"
+        for module in budget.get("deferred_modules", [])
+        if module in imported_modules
+    )
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the app against its budget.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measured imports, the median is used.")
+    parser.add_argument(
+        "--update", action="store_true", help=f"Rewrite the ratio limits as the measured ratios x {BUDGET_HEADROOM}."
+    )
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as budget_file:
+        budget = json.load(budget_file)
+    reference_modules = tuple(budget["reference_modules"])
+
+    # The reference and the entry point imports alternate, so that both see the same machine load.
+    runs, reference_runs = [], []
+    for _ in range(args.repeat):
+        reference_runs.append(measure_import_times(reference_modules))
+        runs.append(measure_import_times((ENTRY_POINT,)))
+    ratios = summarize(runs, reference_runs, reference_modules)
+    for name, ratio in ratios.items():
+        print(f"{name:<16} {ratio:6.3f} x the reference import")
+
+    if args.update:
+        budget["max_reference_ratio"] = {
+            name: round(ratios[name] * BUDGET_HEADROOM, 3) for name in budget.get("max_reference_ratio", ratios)
+        }
+        with open(BUDGET_FILE, "w") as budget_file:
+            json.dump(budget, budget_file, indent=2)
+            budget_file.write("\n")
+        print(f"Budget updated: {budget['max_reference_ratio']}")
+        return
+
+    violations = check_budget(budget, ratios, list(runs[-1]))
+    for violation in violations:
+        print(f"Over budget: {violation}")
+    print("Import time within budget." if not violations else f"{len(violations)} import time budget violations.")
+    raise SystemExit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
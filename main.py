@@ -1,4 +1,12 @@
+import time
+
+# Taken before any other import, so that the startup profile includes the imports.
+STARTUP_TIME = time.perf_counter()
+
+import argparse
 import datetime
+import functools
+from typing import Optional, TYPE_CHECKING
 
 import flet as ft
 import flet_route
@@ -8,12 +16,31 @@ from xpense.components.layout.app_bar import get_app_bar
 from xpense.components.layout.navigation_bar import get_navigation_bar
 from xpense.database.repository_container import RepositoryContainer
 from xpense.types import Routes, Currency, DataAggregation
-from xpense.views.calendar.controls import get_calendar_controls
+from xpense.utilities.profiler import StartupProfiler
 from xpense.views.household.household_controls import get_household_controls
 from xpense.views.view_builder import get_view
 
+if TYPE_CHECKING:
+    from xpense.views.calendar.controls import CalendarNavigator
+
+
+def get_calendar_navigator(
+        page: ft.Page, current_datetime: datetime.datetime, repository_container: RepositoryContainer
+) -> "CalendarNavigator":
+    # The calendar modules are only imported once the calendar is first shown, after the first paint.
+    from xpense.views.calendar.controls import CalendarNavigator
+    return CalendarNavigator(page, current_datetime, repository_container)
+
+
+def get_calendar_view_controls(calendar_navigator: "CalendarNavigator") -> list[ft.Control]:
+    from xpense.views.calendar.controls import get_calendar_controls
+    return get_calendar_controls(calendar_navigator)
+
+
+def main(page: ft.Page, profiler: Optional[StartupProfiler] = None):
+    profiler = profiler or StartupProfiler(enabled=False)
+    profiler.mark("app launch")
 
-def main(page: ft.Page):
     page.title = "Xpense - Expense tracker & budgeting simplified"
     page.adaptive = True  # This will make cool on bots iOS and android.
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
@@ -29,6 +56,10 @@ def main(page: ft.Page):
     data_aggregation = DataAggregation.MONTHLY
     repository_container = RepositoryContainer()
     setup_currency_type = Currency.EURO
+    if profiler.enabled:
+        # Open the database up front, only to tell its time apart from the view build.
+        _ = repository_container.transaction_totals
+        profiler.mark("db open")
 
     # Common layout.
     navigator = get_navigator(page)
@@ -37,24 +68,31 @@ def main(page: ft.Page):
     navigation_bar = get_navigation_bar(navigator)
     page.navigation_bar = navigation_bar
 
-    # Build application views.
+    # Build application views, each one when its route is first shown. The index and the household
+    # routes show the same controls, which are built once.
+    household_controls_factory = functools.cache(profiler.marking("view build", lambda: get_household_controls(
+        page, repository_container, setup_currency_type, data_aggregation,
+        current_datetime
+    )))
+    calendar_navigator_factory = functools.cache(
+        lambda: get_calendar_navigator(page, current_datetime, repository_container)
+    )
+    calendar_controls_factory = profiler.marking(
+        "view build", lambda: get_calendar_view_controls(calendar_navigator_factory())
+    )
     flet_route_main_view = get_view(
         route_url="/",
-        controls=get_household_controls(
-            page, repository_container, setup_currency_type, data_aggregation,
-            current_datetime
-        )
+        controls_factory=household_controls_factory,
     )
     flet_route_household_view = get_view(
         route_url=f"/{Routes.HOUSEHOLD.value.lower()}",
-        controls=get_household_controls(
-            page, repository_container, setup_currency_type, data_aggregation,
-            current_datetime
-        )
+        controls_factory=household_controls_factory,
     )
     flet_route_calendar_view = get_view(
         route_url=f"/{Routes.CALENDAR.value.lower()}",
-        controls=get_calendar_controls(page, current_datetime)
+        controls_factory=calendar_controls_factory,
+        # The calendar is kept between visits, its spending is refreshed after writes from the other views.
+        on_show=lambda: calendar_navigator_factory().refresh(),
     )
 
     # Build application routing.
@@ -81,9 +119,38 @@ def main(page: ft.Page):
     ]
     flet_route.Routing(page, app_routes=app_routes, appbar=app_bar, navigation_bar=navigation_bar)
 
+    def close_app():
+        """Releases the background workers and the database connections, once the app is closed."""
+        if calendar_navigator_factory.cache_info().currsize:
+            # The calendar was shown, its prefetch may still be reading.
+            calendar_navigator_factory().close()
+        repository_container.close()
+
+    def on_window_event(event: ft.WindowEvent):
+        if event.type == ft.WindowEventType.CLOSE:
+            close_app()
+            page.window.destroy()
+
+    # The desktop window waits for the app to close before it is destroyed, a web session is closed on expiry.
+    page.window.prevent_close = True
+    page.window.on_event = on_window_event
+    page.on_close = lambda _: close_app()
+
     page.go(page.route)
     page.update()
+    if profiler.enabled:
+        profiler.mark("first paint")
+        print(f"Startup profile:\n{profiler.report()}")
 
 
 if __name__ == "__main__":
-    ft.app(target=main, assets_dir="assets")
+    parser = argparse.ArgumentParser(description="Xpense - Expense tracker & budgeting simplified.")
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Print the time spent per startup phase: imports, DB open, view build and first paint."
+    )
+    args, _ = parser.parse_known_args()
+
+    startup_profiler = StartupProfiler(STARTUP_TIME, enabled=args.profile_startup)
+    startup_profiler.mark("imports")
+    ft.app(target=functools.partial(main, profiler=startup_profiler), assets_dir="assets")
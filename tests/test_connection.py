@@ -0,0 +1,35 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from xpense.database.connection import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.pool = ConnectionPool(os.path.join(temp_dir.name, "xpense.db"))
+        self.addCleanup(self.pool.close)
+
+    def _read(self):
+        with self.pool.reader() as conn:
+            conn.execute("SELECT 1").fetchone()
+
+    def test_reader_is_reused_by_its_thread(self):
+        self._read()
+        self._read()
+        self.assertEqual(len(self.pool._readers), 1)
+
+    def test_reader_is_closed_when_its_thread_ends(self):
+        for _ in range(10):
+            thread = threading.Thread(target=self._read)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(self.pool._readers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
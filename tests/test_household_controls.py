@@ -0,0 +1,77 @@
+import asyncio
+import datetime
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from xpense.database.repository_container import RepositoryContainer
+from xpense.types import Transaction, TransactionType, Currency, DataAggregation
+from xpense.views.household.household_controls import TransactionListViewSection, TransactionEditContainer
+from xpense.views.household.transaction_view import TransactionEditorView
+
+PAGE_SIZE = 5
+CURRENT_DATETIME = datetime.datetime(2024, 5, 20, 12, 0, 0)
+
+
+class TransactionListViewSectionTest(unittest.TestCase):
+    def setUp(self):
+        self.rc = RepositoryContainer(":memory:")
+        self.addCleanup(self.rc.close)
+        self.rc.transactions.add_many(
+            self._get_expense(CURRENT_DATETIME - datetime.timedelta(hours=hours)) for hours in range(2 * PAGE_SIZE)
+        )
+
+        page = mock.MagicMock()
+        transaction_edit_container = TransactionEditContainer(page, self.rc, TransactionEditorView(page))
+        self.section = TransactionListViewSection(
+            page, self.rc, transaction_edit_container, DataAggregation.MONTHLY, CURRENT_DATETIME,
+            page_size=PAGE_SIZE,
+        )
+        self.section._transaction_type_tabs_section = mock.Mock(get_current_tab_index=mock.Mock(return_value=0))
+        self.list_view = self.section.get()
+        # The list view is not added to a page.
+        self.list_view.update = mock.Mock()
+
+    @staticmethod
+    def _get_expense(date: datetime.datetime) -> Transaction:
+        return Transaction(
+            type=TransactionType.EXPENSE, date=date, amount=1.5, currency=Currency.EURO, category="other",
+            aggregation=DataAggregation.MONTHLY,
+        )
+
+    def _scroll_to_end(self):
+        self.section._on_scroll(SimpleNamespace(pixels=1000, max_scroll_extent=1000))
+
+    def test_first_page_is_shown(self):
+        self.assertEqual(len(self.list_view.controls), PAGE_SIZE)
+
+    def test_cached_listing_is_shown_again(self):
+        self.section._populate_list_view(TransactionType.INCOME, DataAggregation.MONTHLY)
+        self.assertEqual(len(self.list_view.controls), 0)
+        self.section._populate_list_view(TransactionType.EXPENSE, DataAggregation.MONTHLY)
+        self.assertEqual(len(self.list_view.controls), PAGE_SIZE)
+
+    def test_listing_loaded_off_the_event_loop_is_shown(self):
+        asyncio.run(self.section._populate_list_view_async(TransactionType.EXPENSE, DataAggregation.WEEKLY))
+        self.assertEqual(len(self.list_view.controls), PAGE_SIZE)
+
+    def test_scroll_shows_next_page(self):
+        self._scroll_to_end()
+        self.assertEqual(len(self.list_view.controls), 2 * PAGE_SIZE)
+
+    def test_saved_transaction_is_shown(self):
+        transaction = self._get_expense(CURRENT_DATETIME + datetime.timedelta(hours=1))
+        self.rc.transactions.add(transaction)
+        self.section.on_transaction_saved(transaction)
+        self.assertEqual(len(self.list_view.controls), PAGE_SIZE + 1)
+        self.assertIs(self.list_view.controls[0], self.section._listed.rows[transaction.id])
+
+    def test_deleted_transaction_is_removed(self):
+        transaction_id = self.section._listed.transactions[0].id
+        self.rc.transactions.delete(Transaction, transaction_id)
+        self.section.on_transaction_deleted(transaction_id)
+        self.assertEqual(len(self.list_view.controls), PAGE_SIZE - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
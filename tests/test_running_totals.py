@@ -0,0 +1,103 @@
+import datetime
+import unittest
+
+from xpense.database.repository_container import RepositoryContainer
+from xpense.database.running_totals import get_period_key
+from xpense.types import Transaction, TransactionType, DataAggregation, Currency
+
+
+class RunningTotalsTest(unittest.TestCase):
+    def setUp(self):
+        self.rc = RepositoryContainer(":memory:")
+        self.addCleanup(self.rc.close)
+        self.running_totals = self.rc.transaction_totals
+
+    @staticmethod
+    def _get_expense(date: datetime.datetime, amount: float, category: str = "other") -> Transaction:
+        return Transaction(
+            type=TransactionType.EXPENSE, date=date, amount=amount, currency=Currency.EURO, category=category,
+            aggregation=DataAggregation.MONTHLY,
+        )
+
+    def _get_total(self, granularity: DataAggregation, period: str, **key_values) -> float:
+        conditions = [("granularity", "=", granularity), ("period", "=", period)]
+        conditions.extend((name, "=", value) for name, value in key_values.items())
+        return self.running_totals.sum_by(conditions)
+
+    def test_added_transactions_are_totalled(self):
+        self.rc.transactions.add(self._get_expense(datetime.datetime(2024, 5, 20), 10.5))
+        self.rc.transactions.add_many([
+            self._get_expense(datetime.datetime(2024, 5, 21), 4.25),
+            self._get_expense(datetime.datetime(2024, 6, 1), 100),
+        ])
+
+        self.assertEqual(self.running_totals.verify(), [])
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05"), 14.75)
+        self.assertEqual(self._get_total(DataAggregation.YEARLY, "2024"), 114.75)
+
+    def test_updated_transaction_moves_between_totals(self):
+        transaction = self._get_expense(datetime.datetime(2024, 5, 20), 10)
+        self.rc.transactions.add(transaction)
+        self.rc.transactions.add(self._get_expense(datetime.datetime(2024, 5, 21), 5))
+
+        transaction.type = TransactionType.INCOME
+        transaction.category = "salary"
+        transaction.date = datetime.datetime(2024, 7, 3)
+        transaction.amount = 20
+        self.rc.transactions.update(transaction)
+
+        self.assertEqual(self.running_totals.verify(), [])
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05", type=TransactionType.EXPENSE), 5)
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-07", type=TransactionType.INCOME), 20)
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05", category="other"), 5)
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-07", category="salary"), 20)
+
+    def test_deleted_transactions_are_removed_from_the_totals(self):
+        kept = self._get_expense(datetime.datetime(2024, 5, 20), 10)
+        deleted = self._get_expense(datetime.datetime(2024, 5, 21), 5, category="rent")
+        self.rc.transactions.add_many([kept, deleted])
+
+        self.rc.transactions.delete(Transaction, deleted.id)
+
+        self.assertEqual(self.running_totals.verify(), [])
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05"), 10)
+        # The emptied totals are deleted, not kept at zero.
+        self.assertEqual(self.running_totals.sum_by(
+            [("category", "=", "rent")], group_by=["granularity"]
+        ), {})
+
+    def test_iso_week_boundary(self):
+        date = datetime.datetime(2024, 12, 30, 23, 59, 59, 999999)
+        self.rc.transactions.add(self._get_expense(date, 7))
+
+        self.assertEqual(get_period_key(DataAggregation.WEEKLY.value, date), "2025-W01")
+        self.assertEqual(self.running_totals.verify(), [])
+        self.assertEqual(self._get_total(DataAggregation.WEEKLY, "2025-W01"), 7)
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-12"), 7)
+        self.assertEqual(self._get_total(DataAggregation.YEARLY, "2024"), 7)
+
+    def test_rebuild_restores_totals_out_of_sync(self):
+        self.rc.transactions.add(self._get_expense(datetime.datetime(2024, 5, 20), 10))
+        with self.rc.pool.writer() as conn:
+            conn.execute("UPDATE transactiontotals SET amount = amount + 1 WHERE granularity = 'monthly'")
+            conn.commit()
+        self.assertEqual(len(self.running_totals.verify()), 1)
+
+        self.running_totals.rebuild()
+
+        self.assertEqual(self.running_totals.verify(), [])
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05"), 10)
+
+    def test_cached_totals_follow_the_source_writes(self):
+        self.rc.transactions.add(self._get_expense(datetime.datetime(2024, 5, 20), 10))
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05"), 10)
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05"), 10)
+        self.assertEqual(self.rc.transaction_totals._totals.cache_info().hits, 1)
+
+        # The totals table is written by the triggers of the transactions table only.
+        self.rc.transactions.add(self._get_expense(datetime.datetime(2024, 5, 21), 5))
+        self.assertEqual(self._get_total(DataAggregation.MONTHLY, "2024-05"), 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import datetime
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from xpense.database.running_totals import RunningTotals
+from xpense.database.sqlite_repository import BaseRepository
+from xpense.types import Transaction, TransactionType, TransactionTotal
+
+# The transactions table as created before amounts were stored in minor units.
+BASELINE_TRANSACTIONS_SQL = '''
+    CREATE TABLE transactions (
+        type TEXT, date TEXT, amount TEXT, currency TEXT, category TEXT, aggregation TEXT, id TEXT PRIMARY KEY
+    )
+'''
+
+
+class MinorUnitsMigrationTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.db_file = os.path.join(temp_dir.name, "xpense.db")
+
+    def _create_baseline(self, amounts):
+        with sqlite3.connect(self.db_file) as conn:
+            conn.execute(BASELINE_TRANSACTIONS_SQL)
+            conn.executemany(
+                "INSERT INTO transactions (type, date, amount, category, id) VALUES (?, ?, ?, ?, ?)",
+                [
+                    ("expense", "2024-05-20T10:00:00", amount, "other", f"id-{index}")
+                    for index, amount in enumerate(amounts)
+                ],
+            )
+        conn.close()
+
+    def _select(self, sql):
+        conn = sqlite3.connect(self.db_file)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def _open_repository(self, model_class=Transaction) -> BaseRepository:
+        repository = BaseRepository(model_class, self.db_file)
+        self.addCleanup(repository.close)
+        return repository
+
+    def test_amounts_are_converted_like_repository_writes(self):
+        self._create_baseline(["12.5", "1.005", " 3.10 ", "", None])
+        rowids_before = self._select("SELECT id, rowid FROM transactions ORDER BY id")
+
+        repository = self._open_repository()
+
+        self.assertEqual(
+            self._select("SELECT id, amount, typeof(amount) FROM transactions ORDER BY id"),
+            [
+                ("id-0", 1250, "integer"),
+                ("id-1", 101, "integer"),  # Half up, like `_to_minor_units`, not 100 through REAL.
+                ("id-2", 310, "integer"),
+                ("id-3", None, "null"),
+                ("id-4", None, "null"),
+            ],
+        )
+        self.assertEqual(self._select("SELECT id, rowid FROM transactions ORDER BY id"), rowids_before)
+        self.assertEqual(repository.get_by_id(Transaction, "id-1").amount, 1.01)
+
+    def test_non_numeric_amount_aborts_the_migration(self):
+        self._create_baseline(["12.5", "abc"])
+
+        with self.assertRaisesRegex(ValueError, "'amount' of row 2"):
+            BaseRepository(Transaction, self.db_file)
+
+        self.assertEqual(self._select("SELECT amount FROM transactions ORDER BY id"), [("12.5",), ("abc",)])
+        amount_column_type = [
+            column_type for _, name, column_type, *_ in self._select("PRAGMA table_info(transactions)")
+            if name == "amount"
+        ]
+        self.assertEqual(amount_column_type, ["TEXT"])
+
+    def test_table_written_by_triggers_of_another_table_is_migrated(self):
+        transactions = self._open_repository()
+        running_totals = RunningTotals(transactions, self._open_repository(TransactionTotal))
+        transactions.add(Transaction(
+            type=TransactionType.EXPENSE, date=datetime.datetime(2024, 5, 20), amount=2.5, category="other"
+        ))
+        running_totals.close()
+        transactions.close()
+
+        # Store the totals amounts as TEXT again, the transactions triggers writing them are kept.
+        conn = sqlite3.connect(self.db_file, isolation_level=None)
+        try:
+            columns = [name for _, name, *_ in conn.execute("PRAGMA table_info(transactiontotals)")]
+            conn.execute("PRAGMA legacy_alter_table = ON")
+            conn.execute("BEGIN")
+            conn.execute(f"CREATE TABLE baseline ({', '.join(columns)}, PRIMARY KEY (id))")
+            conn.execute("INSERT INTO baseline SELECT * FROM transactiontotals")
+            conn.execute("UPDATE baseline SET amount = CAST(amount / 100.0 AS TEXT)")
+            conn.execute("DROP TABLE transactiontotals")
+            conn.execute("ALTER TABLE baseline RENAME TO transactiontotals")
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        transactions = self._open_repository()
+        running_totals = RunningTotals(transactions, self._open_repository(TransactionTotal))
+        transactions.add(Transaction(
+            type=TransactionType.EXPENSE, date=datetime.datetime(2024, 5, 21), amount=1, category="other"
+        ))
+
+        self.assertEqual(running_totals.verify(), [])
+        self.assertEqual(running_totals.sum_by([("granularity", "=", "monthly")]), 3.5)
+        self.assertEqual(
+            len(self._select("SELECT name FROM sqlite_master WHERE type = 'trigger'")), 3
+        )
+
+
+class AddManyTest(unittest.TestCase):
+    def setUp(self):
+        self.repository = BaseRepository(Transaction, ":memory:")
+        self.addCleanup(self.repository.close)
+
+    @staticmethod
+    def _get_transaction(index: int) -> Transaction:
+        return Transaction(
+            type=TransactionType.EXPENSE, date=datetime.datetime(2024, 5, 20), amount=index, category="other",
+            id=f"id-{index}",
+        )
+
+    def _count_written_rows(self) -> int:
+        # The writer connection of the same thread sees the rows of the transaction in progress.
+        with self.repository.pool.writer() as conn:
+            return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def test_objects_are_inserted_one_chunk_at_a_time(self):
+        written_rows_when_consumed = []
+
+        def get_transactions():
+            for index in range(7):
+                written_rows_when_consumed.append(self._count_written_rows())
+                yield self._get_transaction(index)
+
+        self.assertEqual(self.repository.add_many(get_transactions(), chunk_size=3), 7)
+        # Each chunk is consumed once the previous one is inserted.
+        self.assertEqual(written_rows_when_consumed, [0, 0, 0, 3, 3, 3, 6])
+        self.assertEqual(len(self.repository.get_all()), 7)
+
+    def test_failure_rolls_back_the_inserted_chunks(self):
+        generation = self.repository.generation
+        transactions = [self._get_transaction(index) for index in range(5)]
+        transactions.append(self._get_transaction(1))  # Duplicate id, in the second chunk.
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repository.add_many(transactions, chunk_size=4)
+
+        self.assertEqual(self.repository.get_all(), [])
+        self.assertEqual(self.repository.generation, generation)
+
+    def test_invalid_chunk_size_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.repository.add_many([self._get_transaction(0)], chunk_size=0)
+
+
+class QueryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.repository = BaseRepository(Transaction, ":memory:", cache_size=8)
+        self.addCleanup(self.repository.close)
+        self.repository.add_many(self._get_expense(index) for index in range(3))
+
+    @staticmethod
+    def _get_expense(index: int) -> Transaction:
+        return Transaction(
+            type=TransactionType.EXPENSE, date=datetime.datetime(2024, 5, 20 - index), amount=1.5, category="other"
+        )
+
+    def test_pages_are_cached_until_the_next_write(self):
+        conditions = [("type", "=", TransactionType.EXPENSE)]
+        first_page = self.repository.get_page(conditions, page_size=2)
+
+        self.assertEqual(self.repository.get_page(conditions, page_size=2), first_page)
+        self.assertEqual(self.repository.cache_info().hits, 1)
+
+        self.repository.add(self._get_expense(-1))
+        self.assertEqual(self.repository.get_page(conditions, page_size=2)[1], first_page[0])
+        self.assertEqual(self.repository.cache_info().hits, 1)
+
+    def test_sums_are_cached_until_the_next_write(self):
+        self.assertEqual(self.repository.sum_by("amount"), 4.5)
+        self.assertEqual(self.repository.sum_by("amount"), 4.5)
+        self.assertEqual(self.repository.cache_info().hits, 1)
+
+        self.repository.add(self._get_expense(3))
+        self.assertEqual(self.repository.sum_by("amount"), 6)
+        self.assertEqual(self.repository.cache_info().hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
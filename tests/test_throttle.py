@@ -0,0 +1,53 @@
+import threading
+import time
+import unittest
+
+from xpense.utilities.throttle import Throttle
+
+INTERVAL = 0.01
+
+
+class ThrottleTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.called = threading.Event()
+        self.throttle = Throttle(self._handler, INTERVAL)
+
+    def _handler(self, event):
+        self.calls.append((event, threading.current_thread()))
+        self.called.set()
+
+    def _burst(self, events):
+        self.called.clear()
+        for event in events:
+            self.throttle(event)
+        self.assertTrue(self.called.wait(1))
+
+    def test_burst_calls_the_first_and_the_latest_event(self):
+        self.throttle(0)
+        self._burst([1, 2, 3])
+
+        self.assertEqual([event for event, _ in self.calls], [0, 3])
+
+    def test_trailing_calls_run_on_one_thread(self):
+        for burst in range(5):
+            time.sleep(2 * INTERVAL)
+            self.throttle(burst)
+            self._burst([burst + 0.5])
+
+        trailing_threads = {thread for event, thread in self.calls if event % 1}
+        self.assertEqual(len(self.calls), 10)
+        self.assertEqual(len(trailing_threads), 1)
+        self.assertNotIn(threading.current_thread(), trailing_threads)
+
+    def test_cancelled_call_is_dropped(self):
+        self.throttle(0)
+        self.throttle(1)
+        self.throttle.cancel()
+        time.sleep(3 * INTERVAL)
+
+        self.assertEqual([event for event, _ in self.calls], [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
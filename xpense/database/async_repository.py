@@ -0,0 +1,96 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Tuple, Any, Dict, Union, Type, Iterable, Callable, TypeVar, Generic
+
+from xpense.database.sqlite_repository import BaseRepository, DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE
+
+T = TypeVar('T')
+R = TypeVar('R')
+DEFAULT_MAX_WORKERS = 4
+
+
+class AsyncRepository(Generic[T]):
+    """
+    Awaitable facade of a `BaseRepository`, for async Flet handlers: every call runs on a dedicated
+    thread pool, so slow queries never block the event loop that keeps the UI responsive.
+
+    Reads of different workers run in parallel on their own connections, writes are serialized
+    by the repository connection pool.
+    """
+
+    def __init__(
+            self,
+            repository: BaseRepository,
+            executor: Optional[ThreadPoolExecutor] = None,
+            max_workers: Optional[int] = DEFAULT_MAX_WORKERS,
+    ):
+        """
+        :param repository: The repository the calls are made on.
+        :param executor: The executor the calls run on, by default one owned by this facade.
+        :param max_workers: Number of worker threads of the default executor.
+        """
+        self.repository = repository
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="xpense-db")
+
+    async def run(self, func: Callable[..., R], *args, **kwargs) -> R:
+        """Run any blocking function on the repository executor, e.g. a calculation made of several queries."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def add(self, obj: T):
+        """See `BaseRepository.add`."""
+        await self.run(self.repository.add, obj)
+
+    async def add_many(self, objs: Iterable[T], chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE) -> int:
+        """See `BaseRepository.add_many`."""
+        return await self.run(self.repository.add_many, objs, chunk_size)
+
+    async def update(self, obj: T):
+        """See `BaseRepository.update`."""
+        await self.run(self.repository.update, obj)
+
+    async def delete(self, model_class: Type[T], obj_id: Any):
+        """See `BaseRepository.delete`."""
+        await self.run(self.repository.delete, model_class, obj_id)
+
+    async def get_by_id(self, model_class: Type[T], obj_id: Any) -> Optional[T]:
+        """See `BaseRepository.get_by_id`."""
+        return await self.run(self.repository.get_by_id, model_class, obj_id)
+
+    async def get_all(self) -> List[T]:
+        """See `BaseRepository.get_all`."""
+        return await self.run(self.repository.get_all)
+
+    async def get_by_conditions(
+            self, conditions: List[Tuple[str, str, Any]], logic: Optional[str] = 'AND'
+    ) -> List[T]:
+        """See `BaseRepository.get_by_conditions`."""
+        return await self.run(self.repository.get_by_conditions, conditions, logic)
+
+    async def get_page(
+            self,
+            conditions: List[Tuple[str, str, Any]],
+            logic: Optional[str] = 'AND',
+            after: Optional[Tuple[Any, ...]] = None,
+            page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+            order_by: Optional[Tuple[str, ...]] = ("date", "id"),
+            descending: Optional[bool] = True,
+    ) -> List[T]:
+        """See `BaseRepository.get_page`."""
+        return await self.run(self.repository.get_page, conditions, logic, after, page_size, order_by, descending)
+
+    async def sum_by(
+            self,
+            field_name: str,
+            conditions: Optional[List[Tuple[str, str, Any]]] = None,
+            logic: Optional[str] = 'AND',
+            group_by: Optional[List[Union[str, Tuple[str, str]]]] = None,
+            weight_by: Optional[Tuple[str, Dict[Any, float]]] = None,
+    ) -> Union[float, Dict[Tuple[Any, ...], float]]:
+        """See `BaseRepository.sum_by`."""
+        return await self.run(self.repository.sum_by, field_name, conditions, logic, group_by, weight_by)
+
+    def shutdown(self, wait: Optional[bool] = True):
+        """Stop the executor, once the pending calls are done if `wait`."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,124 @@
+import contextlib
+import dataclasses
+import sqlite3
+import threading
+import weakref
+from typing import Optional, List, Iterator
+
+DEFAULT_STATEMENT_CACHE_SIZE = 256
+IN_MEMORY_DB_FILES = ("", ":memory:")
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionProfile:
+    """The pragmas a connection is configured with when it is opened, None keeps the SQLite default."""
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    mmap_size: Optional[int] = None  # Bytes of the database file read through memory mapping.
+    cache_size: Optional[int] = None  # Pages when positive, KiB when negative.
+    temp_store: Optional[str] = None
+    busy_timeout: Optional[int] = None  # Milliseconds a connection waits for a lock held by another one.
+
+    def apply(self, conn: sqlite3.Connection):
+        """Set the pragmas of the profile on a connection, before it starts any transaction."""
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            if value is not None:
+                conn.execute(f"PRAGMA {field.name} = {value}")
+
+
+# SQLite defaults: rollback journal and synchronous=FULL, every commit waits for the disk twice.
+DEFAULT_PROFILE = ConnectionProfile()
+
+# Write-ahead logging: readers no longer block on a writer, nor a writer on readers, and with
+# synchronous=NORMAL commits only append to the log, which is synced at checkpoints. A commit can
+# be lost on power failure, but the database is never corrupted.
+WAL_PROFILE = ConnectionProfile(
+    journal_mode="WAL",
+    synchronous="NORMAL",
+    mmap_size=64 * 1024 * 1024,
+    cache_size=-16 * 1024,
+    temp_store="MEMORY",
+    busy_timeout=5000,
+)
+
+
+class _ReaderHandle:
+    """The reader connection of a thread, kept in a thread local, so that it is released when the thread ends."""
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class ConnectionPool:
+    """
+    The connections to a database file: one reader connection per thread, so that threads read in
+    parallel without sharing cursor state, and a single writer connection, used by one thread at a time.
+    The reader connection of a thread is closed when the thread ends.
+
+    Writers queue on a reentrant lock, so a write can run nested writes of the same thread, e.g. the
+    running totals rebuild inside the trigger installation. An in-memory database only exists on the
+    connection that created it, so its reads also go through the writer connection.
+    """
+
+    def __init__(
+            self,
+            db_file: str,
+            connection_profile: Optional[ConnectionProfile] = DEFAULT_PROFILE,
+            statement_cache_size: Optional[int] = DEFAULT_STATEMENT_CACHE_SIZE,
+    ):
+        self.db_file = db_file
+        self._connection_profile = connection_profile
+        self._statement_cache_size = statement_cache_size
+        self._in_memory = db_file in IN_MEMORY_DB_FILES
+
+        self._writer_lock = threading.RLock()
+        self._writer = self._connect()
+        self._local = threading.local()
+        self._readers_lock = threading.Lock()
+        self._readers: List[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are only used by one thread at a time, but closed by the thread closing the pool.
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, cached_statements=self._statement_cache_size)
+        self._connection_profile.apply(conn)
+        return conn
+
+    @contextlib.contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Yield the reader connection of the current thread, opened on its first use."""
+        if self._in_memory:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        handle = getattr(self._local, "reader", None)
+        if handle is None:
+            handle = _ReaderHandle(self._connect())
+            weakref.finalize(handle, self._close_reader, handle.conn)
+            self._local.reader = handle
+            with self._readers_lock:
+                self._readers.append(handle.conn)
+        yield handle.conn
+
+    def _close_reader(self, conn: sqlite3.Connection):
+        with self._readers_lock:
+            if conn in self._readers:
+                self._readers.remove(conn)
+        conn.close()
+
+    @contextlib.contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Yield the writer connection, once the writes of the other threads are done."""
+        with self._writer_lock:
+            yield self._writer
+
+    def close(self):
+        """Close the writer and every reader connection."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        with self._writer_lock:
+            self._writer.close()
@@ -0,0 +1,66 @@
+from typing import Optional, List, Tuple, Any, Dict, Callable, Iterable
+
+VALID_OPERATORS = ('=', '!=', '<', '>', '<=', '>=', 'LIKE')
+VALID_LOGICS = ('AND', 'OR')
+
+# The shape of conditions is their logic and sorted (field_name, operator) pairs, without the values.
+ConditionsShape = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class QueryBuilder:
+    """
+    Build the SQL of the queries of a table from conditions in the form (field_name, operator, value).
+
+    Conditions are sorted by field and operator, so conditions of the same shape always give the same
+    SQL text, in whatever order they are passed, e.g. as a set, and SQLite reuses its prepared statement.
+    The SQL text of each shape is validated and built once.
+    """
+
+    def __init__(self, table_name: str, field_serializers: Dict[str, Callable[[Any], Any]]):
+        """
+        :param table_name: The table queried.
+        :param field_serializers: The serializer of each field, in column order, used to bind the values.
+        """
+        self._table_name = table_name
+        self._field_serializers = field_serializers
+        self._columns_sql = ", ".join(field_serializers)
+        self._where_sql_by_shape: Dict[ConditionsShape, str] = {}
+
+    def where(
+            self, conditions: Iterable[Tuple[str, str, Any]], logic: Optional[str] = 'AND'
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause, with a leading space, and its parameters; empty without conditions."""
+        conditions = sorted(conditions, key=lambda condition: (condition[0], condition[1].upper()))
+        shape = (logic.upper(), tuple((field_name, operator.upper()) for field_name, operator, _ in conditions))
+
+        where_sql = self._where_sql_by_shape.get(shape)
+        if where_sql is None:
+            where_sql = self._build_where_sql(shape)
+            self._where_sql_by_shape[shape] = where_sql
+
+        params = [self._field_serializers[field_name](value) for field_name, _, value in conditions]
+        return where_sql, params
+
+    def select(
+            self, conditions: Iterable[Tuple[str, str, Any]], logic: Optional[str] = 'AND'
+    ) -> Tuple[str, List[Any]]:
+        """Build the query selecting every column of the rows that match the conditions, and its parameters."""
+        where_sql, params = self.where(conditions, logic)
+        return f"SELECT {self._columns_sql} FROM {self._table_name}{where_sql}", params
+
+    def _build_where_sql(self, shape: ConditionsShape) -> str:
+        logic, fields_and_operators = shape
+        if logic not in VALID_LOGICS:
+            raise ValueError(f"Invalid logic '{logic}' in conditions, use one of {list(VALID_LOGICS)}.")
+
+        where_clauses = []
+        for field_name, operator in fields_and_operators:
+            if field_name not in self._field_serializers:
+                raise ValueError(f"Invalid field name '{field_name}' in conditions.")
+            if operator not in VALID_OPERATORS:
+                raise ValueError(f"Invalid operator '{operator}' in conditions.")
+            where_clauses.append(f"{field_name} {operator} ?")
+
+        if not where_clauses:
+            return ""
+        return f" WHERE {f' {logic} '.join(where_clauses)}"
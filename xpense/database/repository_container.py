@@ -1,9 +1,47 @@
 import dataclasses
+import functools
 
-from xpense.database.sqlite_repository import BaseRepository
-from xpense.types import Transaction
+from xpense.database.async_repository import AsyncRepository
+from xpense.database.connection import ConnectionPool, WAL_PROFILE
+from xpense.database.running_totals import RunningTotals
+from xpense.database.sqlite_repository import BaseRepository, DEFAULT_DB_FILE
+from xpense.types import Transaction, TransactionTotal
+
+QUERY_CACHE_SIZE = 64
 
 
 @dataclasses.dataclass
 class RepositoryContainer:
-    transactions = BaseRepository(Transaction)
+    """
+    The repositories of the app, shared by every view. Each one is opened on its first use, so creating
+    the container, or importing this module, never touches the database file.
+    """
+    db_file: str = DEFAULT_DB_FILE
+
+    @functools.cached_property
+    def pool(self) -> ConnectionPool:
+        """The connections of every repository, so that they share a single writer."""
+        return ConnectionPool(self.db_file, WAL_PROFILE)
+
+    @functools.cached_property
+    def transactions(self) -> BaseRepository:
+        return BaseRepository(Transaction, self.db_file, cache_size=QUERY_CACHE_SIZE, pool=self.pool)
+
+    @functools.cached_property
+    def transaction_totals(self) -> RunningTotals:
+        return RunningTotals(
+            self.transactions,
+            BaseRepository(TransactionTotal, self.db_file, cache_size=QUERY_CACHE_SIZE, pool=self.pool),
+        )
+
+    @functools.cached_property
+    def async_transactions(self) -> AsyncRepository:
+        """Awaitable access to the transactions, for async UI handlers."""
+        return AsyncRepository(self.transactions)
+
+    def close(self):
+        """Close the repositories that were opened."""
+        if "async_transactions" in self.__dict__:
+            self.async_transactions.shutdown()
+        if "pool" in self.__dict__:
+            self.pool.close()
@@ -0,0 +1,225 @@
+import argparse
+import datetime
+import sqlite3
+from dataclasses import fields
+from typing import Optional, List, Tuple, Any, Dict, Union
+
+from xpense.database.sqlite_repository import BaseRepository, DEFAULT_DB_FILE
+
+TOTALS_RESERVED_FIELDS = ("id", "granularity", "period", "count")
+
+PERIOD_SQL_FORMATS = {
+    # Granularity: SQLite expression of the period key of an ISO formatted date, e.g. 2024-W07, 2024-02
+    # and 2024. Only the date part is parsed, SQLite would round fractional seconds up to the next day.
+    # ISO weeks belong to the year of their Thursday and are numbered from that year's first one.
+    "weekly": "strftime('%Y', date(substr({0}, 1, 10), '-3 days', 'weekday 4')) || '-W' || "
+              "printf('%02d', (CAST(strftime('%j', date(substr({0}, 1, 10), '-3 days', 'weekday 4')) AS INTEGER)"
+              " - 1) / 7 + 1)",
+    "monthly": "substr({0}, 1, 7)",
+    "yearly": "substr({0}, 1, 4)",
+}
+
+
+def get_period_key(granularity: str, date: datetime.datetime) -> str:
+    """Returns the period key of a date, matching the keys that SQLite computes in `PERIOD_SQL_FORMATS`."""
+    if granularity == "weekly":
+        iso_year, iso_week, _ = date.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    elif granularity == "monthly":
+        return date.strftime("%Y-%m")
+    elif granularity == "yearly":
+        return date.strftime("%Y")
+    raise ValueError(f"Unknown granularity '{granularity}'. Use one of {list(PERIOD_SQL_FORMATS)}.")
+
+
+class RunningTotals:
+    """
+    Rollups of an amount field per ISO week, month and year and per key fields, kept in a
+    totals table that SQLite triggers update on every insert, update and delete of the source table.
+
+    The totals model is a dataclass with an `id`, a `granularity` (weekly, monthly or yearly),
+    a `period` key, a `count`, the amount field and the key fields, named as in the source model.
+    Every source row is counted once per granularity.
+    """
+
+    def __init__(
+            self,
+            source: BaseRepository,
+            totals: BaseRepository,
+            amount_field: Optional[str] = "amount",
+            date_field: Optional[str] = "date",
+    ):
+        self._source = source
+        self._totals = totals
+        self._totals.add_trigger_writer(self._source)
+        self._amount_field = amount_field
+        self._date_field = date_field
+        self._key_fields = [
+            field.name for field in fields(self._totals.model_class)
+            if field.name not in (*TOTALS_RESERVED_FIELDS, self._amount_field)
+        ]
+        self._columns = ["id", "granularity", "period", *self._key_fields, self._amount_field, "count"]
+        self.install()
+
+    def _get_period_sql(self, granularity: str, row: str) -> str:
+        return PERIOD_SQL_FORMATS[granularity].format(f"{row}.{self._date_field}")
+
+    def _get_id_sql(self, granularity: str, row: str) -> str:
+        """The id of a total is the concatenation of its granularity, period and key values."""
+        parts = [self._get_period_sql(granularity, row), *(f"{row}.{name}" for name in self._key_fields)]
+        return " || '|' || ".join([f"'{granularity}'", *(f"IFNULL({part}, '')" for part in parts)])
+
+    def _get_apply_delta_sql(self, row: str, sign: str) -> str:
+        """Upsert the amount and count of a source row into its totals, added or subtracted by sign."""
+        statements = []
+        for granularity in PERIOD_SQL_FORMATS:
+            values = [
+                self._get_id_sql(granularity, row),
+                f"'{granularity}'",
+                self._get_period_sql(granularity, row),
+                *(f"{row}.{name}" for name in self._key_fields),
+                f"{sign}IFNULL({row}.{self._amount_field}, 0)",
+                f"{sign}1",
+            ]
+            statements.append(f'''
+                INSERT INTO {self._totals.table_name} ({", ".join(self._columns)})
+                VALUES ({", ".join(values)})
+                ON CONFLICT (id) DO UPDATE SET
+                    {self._amount_field} = {self._amount_field} + excluded.{self._amount_field},
+                    count = count + excluded.count;
+            ''')
+        return "".join(statements)
+
+    def _get_cleanup_sql(self, row: str) -> str:
+        ids_sql = ", ".join(self._get_id_sql(granularity, row) for granularity in PERIOD_SQL_FORMATS)
+        return f'''
+            DELETE FROM {self._totals.table_name} WHERE id IN ({ids_sql}) AND count = 0;
+        '''
+
+    def _get_triggers_sql(self) -> Dict[str, str]:
+        source_table = self._source.table_name
+        triggers_body = {
+            "insert": self._get_apply_delta_sql("NEW", ""),
+            "update": self._get_apply_delta_sql("OLD", "-") + self._get_cleanup_sql("OLD")
+                      + self._get_apply_delta_sql("NEW", ""),
+            "delete": self._get_apply_delta_sql("OLD", "-") + self._get_cleanup_sql("OLD"),
+        }
+        return {
+            f"{source_table}_totals_{event}":
+                f"CREATE TRIGGER {source_table}_totals_{event} AFTER {event.upper()} ON {source_table} "
+                f"BEGIN {body} END"
+            for event, body in triggers_body.items()
+        }
+
+    def install(self):
+        """Create the maintenance triggers, replacing outdated ones, and rebuild the totals if any changed."""
+        triggers_sql = self._get_triggers_sql()
+        with self._source.pool.writer() as conn:
+            existing_triggers = dict(conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+                (self._source.table_name,)
+            ))
+            outdated_triggers = [
+                name for name, trigger_sql in triggers_sql.items() if existing_triggers.get(name) != trigger_sql
+            ]
+            if not outdated_triggers:
+                return
+
+            try:
+                conn.execute("BEGIN")
+                for name in outdated_triggers:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+                    conn.execute(triggers_sql[name])
+                self._rebuild(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._totals.generation += 1
+
+    def _get_expected_totals_sql(self) -> str:
+        """Select the totals, in the totals columns order, recomputed from the source table."""
+        key_columns = ", ".join(f"src.{name}" for name in self._key_fields)
+        return " UNION ALL ".join(f'''
+            SELECT {self._get_id_sql(granularity, "src")} AS id, '{granularity}' AS granularity,
+                   {self._get_period_sql(granularity, "src")} AS period, {key_columns},
+                   SUM(IFNULL(src.{self._amount_field}, 0)) AS {self._amount_field}, COUNT(*) AS count
+            FROM {self._source.table_name} AS src
+            GROUP BY 1
+        ''' for granularity in PERIOD_SQL_FORMATS)
+
+    def _rebuild(self, conn: sqlite3.Connection):
+        conn.execute(f"DELETE FROM {self._totals.table_name}")
+        conn.execute(f'''
+            INSERT INTO {self._totals.table_name} ({", ".join(self._columns)})
+            {self._get_expected_totals_sql()}
+        ''')
+
+    def rebuild(self):
+        """Recompute every total from the source table."""
+        with self._source.pool.writer() as conn:
+            try:
+                conn.execute("BEGIN")
+                self._rebuild(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._totals.generation += 1
+
+    def verify(self) -> List[str]:
+        """Compare the totals with the source table and return the ids of the totals that are out of sync."""
+        stored_totals_sql = f"SELECT {', '.join(self._columns)} FROM {self._totals.table_name}"
+        expected_totals_sql = self._get_expected_totals_sql()
+        with self._source.pool.reader() as conn:
+            cursor = conn.execute(f'''
+                SELECT id FROM ({expected_totals_sql} EXCEPT {stored_totals_sql})
+                UNION
+                SELECT id FROM ({stored_totals_sql} EXCEPT SELECT * FROM ({expected_totals_sql}))
+            ''')
+            return [total_id for total_id, in cursor.fetchall()]
+
+    def sum_by(
+            self,
+            conditions: Optional[List[Tuple[str, str, Any]]] = None,
+            logic: Optional[str] = 'AND',
+            group_by: Optional[List[str]] = None,
+            weight_by: Optional[Tuple[str, Dict[Any, float]]] = None,
+    ) -> Union[float, Dict[Tuple[Any, ...], float]]:
+        """
+        Sum the totals, see `BaseRepository.sum_by`. Conditions apply to the granularity, period and
+        key fields, and should select a single granularity, otherwise rows are counted more than once.
+        """
+        return self._totals.sum_by(
+            self._amount_field, conditions=conditions, logic=logic, group_by=group_by, weight_by=weight_by
+        )
+
+    def close(self):
+        """Close the totals repository, the source repository is left open to its owner."""
+        self._totals.close()
+
+
+def main():
+    from xpense.types import Transaction, TransactionTotal
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the running totals of the transactions.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--db-file", default=DEFAULT_DB_FILE)
+    args = parser.parse_args()
+
+    running_totals = RunningTotals(
+        BaseRepository(Transaction, args.db_file), BaseRepository(TransactionTotal, args.db_file)
+    )
+    if args.command == "rebuild":
+        running_totals.rebuild()
+        print("Running totals rebuilt.")
+    else:
+        out_of_sync_totals = running_totals.verify()
+        for total_id in out_of_sync_totals:
+            print(f"Out of sync: {total_id}")
+        print(f"{len(out_of_sync_totals)} running totals out of sync.")
+        raise SystemExit(1 if out_of_sync_totals else 0)
+
+
+if __name__ == "__main__":
+    main()
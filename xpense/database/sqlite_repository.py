@@ -1,30 +1,106 @@
 import inspect
 import sqlite3
-from dataclasses import fields
+import threading
+from collections import OrderedDict, namedtuple
+from dataclasses import fields, Field
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from enum import Enum
-from typing import Type, TypeVar, Optional, Any, List, get_origin, get_args, Union, Tuple
+from itertools import islice
+from typing import Type, TypeVar, Optional, Any, List, get_origin, get_args, Union, Tuple, Iterable, Callable, \
+    Dict
+
+from xpense.database.connection import ConnectionProfile, ConnectionPool, DEFAULT_PROFILE, \
+    DEFAULT_STATEMENT_CACHE_SIZE
+from xpense.database.query_builder import QueryBuilder
 
 T = TypeVar('T')
 DEFAULT_DB_FILE = "xpense.db"
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_PAGE_SIZE = 50
+
+# Field metadata flag for monetary amounts, which are stored as INTEGER minor units (cents)
+# and returned as numbers, e.g. `amount: Optional[float] = field(metadata={MINOR_UNITS: True})`.
+MINOR_UNITS = "minor_units"
+MINOR_UNITS_FACTOR = 100
+
+# Date parts a date field can be grouped by in `sum_by`: SQLite expression of the key of an ISO formatted
+# date, e.g. 2024-02-16, 2024-02 and 2024. Taken from the text rather than with SQLite's `date()`,
+# which rounds fractional seconds up to the next day, and which no index could serve.
+DATE_PARTS = {
+    "day": "substr({0}, 1, 10)",
+    "month": "substr({0}, 1, 7)",
+    "year": "substr({0}, 1, 4)",
+}
+
+# Statistics of the query result cache, like `functools.lru_cache` reports them.
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
 
 
 class BaseRepository:
-    def __init__(self, model_class: Type[T], db_file: Optional[str] = DEFAULT_DB_FILE):
-        """Initialize the repository with a database file."""
-        self.conn = sqlite3.connect(db_file, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Access columns by name.
+    def __init__(
+            self,
+            model_class: Type[T],
+            db_file: Optional[str] = DEFAULT_DB_FILE,
+            cache_size: Optional[int] = 0,
+            statement_cache_size: Optional[int] = DEFAULT_STATEMENT_CACHE_SIZE,
+            connection_profile: Optional[ConnectionProfile] = DEFAULT_PROFILE,
+            pool: Optional[ConnectionPool] = None,
+    ):
+        """
+        Initialize the repository with a database file.
+
+        :param model_class: The dataclass stored in the table.
+        :param db_file: The SQLite database file.
+        :param cache_size: Maximum number of query results kept by `get_all`, `get_by_conditions`, `get_page`
+                           and `sum_by`, least recently used first out, 0 disables the cache. Results are only
+                           valid while the table is written through this repository, or by the triggers of
+                           the repositories declared with `add_trigger_writer`.
+        :param statement_cache_size: Number of prepared statements SQLite keeps for reuse on each connection.
+        :param connection_profile: The pragmas of the connections, e.g. `WAL_PROFILE`.
+        :param pool: A connection pool shared with the other repositories of the database, which then
+                     also share its writer, instead of a pool of their own. It replaces the other connection
+                     options, and is the only way for several repositories to use one in-memory database.
+        """
+        # Reads run on a connection per thread and writes on a single, serialized, writer connection.
+        self.pool = pool or ConnectionPool(db_file, connection_profile, statement_cache_size)
         self.model_class = model_class
+        # Bumped by every write, so that callers caching query results can tell when they are stale.
+        self.generation = 0
+
+        # Query result cache, mapping a normalized query to the generation and rows it was read at.
+        # Rows are plain tuples and decoded on every hit, so callers never share mutable objects.
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[Any, Tuple[Tuple[int, ...], List[Tuple[Any, ...]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Repositories whose table triggers write this table, their writes also make the cached results stale.
+        self._trigger_writers: List["BaseRepository"] = []
 
         self.table_name = model_class.__name__.lower() + "s"  # tables are plural.
         self.create_table(self.model_class)
+        self._insert_sql = self._get_insert_sql()
+        self._field_serializers: Dict[str, Callable[[Any], Any]] = {
+            field.name: self._get_field_serializer(field) for field in fields(self.model_class)
+        }
+        self._field_deserializers: Dict[str, Optional[Callable[[Any], Any]]] = {
+            field.name: self._get_field_deserializer(field) for field in fields(self.model_class)
+        }
+        self._query_builder = QueryBuilder(self.table_name, self._field_serializers)
+        self._minor_units_fields = {field.name for field in fields(self.model_class) if field.metadata.get(MINOR_UNITS)}
+
+        # Rows are plain tuples, selected in dataclass field order, so they can be
+        # decoded positionally without any per-row reflection.
+        self._columns_sql = ", ".join(field.name for field in fields(self.model_class))
+        self._row_decoder = self._compile_row_decoder(self.model_class)
 
     def create_table(self, model_class: Type[T]):
         """Create a table based on the dataclass fields."""
         columns = []
         for field in fields(model_class):
             column_name = field.name
-            column_type = self._get_sqlite_type(field.type)
+            column_type = self._get_column_type(field)
             if field.name == 'id':
                 columns.append(f"{column_name} {column_type} PRIMARY KEY")
             else:
@@ -33,59 +109,224 @@ class BaseRepository:
         create_table_sql = f'''
             CREATE TABLE IF NOT EXISTS {self.table_name} ({columns_sql})
         '''
-        self.conn.execute(create_table_sql)
-        self.conn.commit()
+        with self.pool.writer() as conn:
+            conn.execute(create_table_sql)
+            self._add_missing_columns(conn, model_class)
+            self._migrate_column_types(conn, model_class, columns_sql)
+            index_names = [
+                self._create_index(conn, model_class, index_columns)
+                for index_columns in getattr(model_class, "__indexes__", ())
+            ]
+            self._drop_undeclared_indexes(conn, index_names)
+            conn.commit()
 
-    def add(self, obj: T):
-        """Add a new object to the database."""
-        column_names = [field.name for field in fields(obj)]
+    def _add_missing_columns(self, conn: sqlite3.Connection, model_class: Type[T]):
+        """Add the columns of fields that were added to the model after its table was created."""
+        existing_columns = {name for _, name, *_ in conn.execute(f"PRAGMA table_info({self.table_name})")}
+        for field in fields(model_class):
+            if field.name not in existing_columns:
+                conn.execute(
+                    f"ALTER TABLE {self.table_name} ADD COLUMN {field.name} {self._get_column_type(field)}"
+                )
+
+    def _migrate_column_types(self, conn: sqlite3.Connection, model_class: Type[T], columns_sql: str):
+        """
+        Rebuild the table in place when the type of an existing column no longer matches
+        its field, converting the stored values, e.g. TEXT amounts into INTEGER minor units.
+
+        SQLite cannot alter a column type, so the rows are copied into a new table inside
+        a single transaction, and the old table (with its indexes) is dropped. Amounts are converted
+        to minor units by `_to_minor_units`, like the ones written by the repository, and a stored
+        amount that is not a number aborts the migration, leaving the table as it was.
+        """
+        existing_types = {
+            name: column_type.upper()
+            for _, name, column_type, *_ in conn.execute(f"PRAGMA table_info({self.table_name})")
+        }
+        copy_columns = []
+        copy_expressions = []
+        minor_units_columns = []
+        needs_migration = False
+        for field in fields(model_class):
+            if field.name not in existing_types:
+                continue
+            column_type = self._get_column_type(field)
+            copy_columns.append(field.name)
+            if existing_types[field.name] == column_type:
+                copy_expressions.append(field.name)
+                continue
+
+            needs_migration = True
+            if field.metadata.get(MINOR_UNITS):
+                # Filled in by the update below, rounding in SQL through REAL would lose cents.
+                copy_expressions.append("NULL")
+                minor_units_columns.append(field.name)
+            else:
+                copy_expressions.append(f"CAST({field.name} AS {column_type})")
+
+        if not needs_migration:
+            return
+
+        migration_table_name = f"{self.table_name}_migration"
+        try:
+            conn.execute("BEGIN")
+            converted_rows = self._convert_minor_units_columns(conn, minor_units_columns)
+            conn.execute(f"DROP TABLE IF EXISTS {migration_table_name}")
+            conn.execute(f"CREATE TABLE {migration_table_name} ({columns_sql})")
+            conn.execute(f'''
+                INSERT INTO {migration_table_name} (rowid, {", ".join(copy_columns)})
+                SELECT rowid, {", ".join(copy_expressions)} FROM {self.table_name}
+            ''')
+            if minor_units_columns:
+                assignments = ", ".join(f"{name} = ?" for name in minor_units_columns)
+                conn.executemany(
+                    f"UPDATE {migration_table_name} SET {assignments} WHERE rowid = ?", converted_rows
+                )
+            # As SQLite documents for table rebuilds, the triggers on the table or writing to it are
+            # dropped before the swap, a trigger of another table naming a missing table fails the rename,
+            # and created again after it.
+            triggers = self._get_dependent_triggers(conn)
+            for trigger_name, _ in triggers:
+                conn.execute(f"DROP TRIGGER {trigger_name}")
+            conn.execute(f"DROP TABLE {self.table_name}")
+            conn.execute(f"ALTER TABLE {migration_table_name} RENAME TO {self.table_name}")
+            for _, trigger_sql in triggers:
+                conn.execute(trigger_sql)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _get_dependent_triggers(self, conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+        """Return the name and SQL of the triggers on the table, or whose statements name it."""
+        cursor = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND (tbl_name = ? OR sql LIKE ?)",
+            (self.table_name, f"%{self.table_name}%"),
+        )
+        return cursor.fetchall()
+
+    def _convert_minor_units_columns(self, conn: sqlite3.Connection, column_names: List[str]) -> List[List[Any]]:
+        """Return the values of the columns of each row converted into minor units, followed by the row id."""
+        if not column_names:
+            return []
+        converted_rows = []
+        for rowid, *values in conn.execute(f"SELECT rowid, {', '.join(column_names)} FROM {self.table_name}"):
+            converted_row = []
+            for column_name, value in zip(column_names, values):
+                try:
+                    converted_row.append(self._to_minor_units(value))
+                except ValueError as error:
+                    raise ValueError(
+                        f"Cannot migrate '{column_name}' of row {rowid} in '{self.table_name}': {error}"
+                    ) from error
+            converted_rows.append([*converted_row, rowid])
+        return converted_rows
+
+    def _create_index(self, conn: sqlite3.Connection, model_class: Type[T], index_columns: Tuple[str, ...]) -> str:
+        """Create a secondary index over the given columns if it does not exist yet, and return its name."""
+        valid_fields = [field.name for field in fields(model_class)]
+        for column_name in index_columns:
+            if column_name not in valid_fields:
+                raise ValueError(f"Invalid field name '{column_name}' in index {index_columns}.")
+        index_name = f"idx_{self.table_name}_{'_'.join(index_columns)}"
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS {index_name} ON {self.table_name} ({", ".join(index_columns)})
+        ''')
+        return index_name
+
+    def _drop_undeclared_indexes(self, conn: sqlite3.Connection, index_names: List[str]):
+        """Drop the indexes previously created for this table that the model no longer declares."""
+        cursor = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND name LIKE ?",
+            (self.table_name, f"idx_{self.table_name}_%"),
+        )
+        for index_name, in cursor.fetchall():
+            if index_name not in index_names:
+                conn.execute(f"DROP INDEX {index_name}")
+
+    def _get_insert_sql(self) -> str:
+        column_names = [field.name for field in fields(self.model_class)]
         placeholders = ", ".join("?" for _ in column_names)
         columns_sql = ", ".join(column_names)
-        values = [self._serialize_field(getattr(obj, field.name), field.type) for field in fields(obj)]
-        insert_sql = f'''
+        return f'''
             INSERT INTO {self.table_name} ({columns_sql})
             VALUES ({placeholders})
         '''
-        self.conn.execute(insert_sql, values)
-        self.conn.commit()
+
+    def _serialize_object(self, obj: T) -> List[Any]:
+        return [serializer(getattr(obj, name)) for name, serializer in self._field_serializers.items()]
+
+    def add(self, obj: T):
+        """Add a new object to the database."""
+        with self.pool.writer() as conn:
+            conn.execute(self._insert_sql, self._serialize_object(obj))
+            conn.commit()
+            self.generation += 1
+
+    def add_many(self, objs: Iterable[T], chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Add many objects to the database inside a single transaction.
+
+        :param objs: Any iterable of objects, it is consumed lazily one chunk at a time.
+        :param chunk_size: Number of rows handed to each `executemany` call.
+        :return: Number of inserted rows.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"Invalid chunk size '{chunk_size}', it should be a positive integer.")
+
+        iterator = iter(objs)
+        inserted_count = 0
+        with self.pool.writer() as conn:
+            try:
+                while chunk := [self._serialize_object(obj) for obj in islice(iterator, chunk_size)]:
+                    conn.executemany(self._insert_sql, chunk)
+                    inserted_count += len(chunk)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self.generation += 1
+        return inserted_count
 
     def get_by_id(self, model_class: Type[T], obj_id: Any) -> Optional[T]:
         """Retrieve an object by its ID."""
-        cursor = self.conn.execute(f'''
-            SELECT * FROM {self.table_name} WHERE id = ?
-        ''', (obj_id,))
-        row = cursor.fetchone()
+        with self.pool.reader() as conn:
+            row = conn.execute(f'''
+                SELECT {self._columns_sql} FROM {self.table_name} WHERE id = ?
+            ''', (obj_id,)).fetchone()
         if row:
-            return self._row_to_object(row, model_class)
+            return self._row_to_object(row)
         return None
 
     def get_all(self) -> List[T]:
         """Retrieve all objects of the given model class."""
-        cursor = self.conn.execute(f'''SELECT * FROM {self.table_name}''')
-        rows = cursor.fetchall()
-        return [self._row_to_object(row, self.model_class) for row in rows]
+        rows = self._fetch_rows(("all",), f"SELECT {self._columns_sql} FROM {self.table_name}", [])
+        return list(map(self._row_decoder, rows))
 
     def update(self, obj: T):
         """Update an existing object."""
         column_names = [field.name for field in fields(obj) if field.name != 'id']
         assignments = ", ".join(f"{name} = ?" for name in column_names)
-        values = [self._serialize_field(getattr(obj, name), field.type)
-                  for name, field in zip(column_names, fields(obj)[1:])]  # Skip 'id' field
+        values = [self._field_serializers[name](getattr(obj, name)) for name in column_names]
         values.append(obj.id)
         update_sql = f'''
             UPDATE {self.table_name}
             SET {assignments}
             WHERE id = ?
         '''
-        self.conn.execute(update_sql, values)
-        self.conn.commit()
+        with self.pool.writer() as conn:
+            conn.execute(update_sql, values)
+            conn.commit()
+            self.generation += 1
 
     def delete(self, model_class: Type[T], obj_id: Any):
         """Delete an object by its ID."""
-        self.conn.execute(f'''
-            DELETE FROM {self.table_name} WHERE id = ?
-        ''', (obj_id,))
-        self.conn.commit()
+        with self.pool.writer() as conn:
+            conn.execute(f'''
+                DELETE FROM {self.table_name} WHERE id = ?
+            ''', (obj_id,))
+            conn.commit()
+            self.generation += 1
 
     def get_by_conditions(self, conditions: List[Tuple[str, str, Any]], logic: Optional[str] = 'AND') -> List[T]:
         """
@@ -96,40 +337,241 @@ class BaseRepository:
         :param logic: Logical operator to combine conditions ('AND' or 'OR'). Default is 'AND'.
         :return: List of objects of type T.
         """
-        valid_fields = [field.name for field in fields(self.model_class)]
-        where_clauses = []
+        query_sql, params = self._build_conditions_query(conditions, logic)
+        rows = self._fetch_rows(self._get_conditions_cache_key(conditions, logic), query_sql, params)
+        return list(map(self._row_decoder, rows))
+
+    def _get_conditions_cache_key(self, conditions: List[Tuple[str, str, Any]], logic: Optional[str] = 'AND') -> Any:
+        """
+        Conditions combined by a single logical operator are order independent and idempotent,
+        so the same conditions in any order, or repeated, share one cache entry.
+        """
+        return "conditions", logic.upper(), frozenset(
+            (field_name, operator.upper(), self._field_serializers[field_name](value))
+            for field_name, operator, value in conditions
+        )
+
+    def _fetch_rows(self, cache_key: Any, query_sql: str, params: List[Any]) -> List[Tuple[Any, ...]]:
+        """Run a query, or return its cached rows if the table was not written since it last ran."""
+        if not self._cache_size:
+            return self._read_rows(query_sql, params)
+
+        # Read before the query, so that a write made meanwhile leaves the result stale.
+        generation = self._get_cache_generation()
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None and cached[0] == generation:
+                self._cache.move_to_end(cache_key)
+                self._cache_hits += 1
+                return cached[1]
+            self._cache_misses += 1
+
+        rows = self._read_rows(query_sql, params)
+        with self._cache_lock:
+            self._cache[cache_key] = (generation, rows)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return rows
+
+    def _get_cache_generation(self) -> Tuple[int, ...]:
+        return self.generation, *(repository.generation for repository in self._trigger_writers)
+
+    def add_trigger_writer(self, repository: "BaseRepository"):
+        """Declare that the triggers of another repository's table write this table, see `cache_size`."""
+        self._trigger_writers.append(repository)
+
+    def _read_rows(self, query_sql: str, params: List[Any]) -> List[Tuple[Any, ...]]:
+        with self.pool.reader() as conn:
+            return conn.execute(query_sql, params).fetchall()
+
+    def cache_info(self) -> CacheInfo:
+        """Return the hits, misses, maximum size and current size of the query result cache."""
+        with self._cache_lock:
+            return CacheInfo(self._cache_hits, self._cache_misses, self._cache_size, len(self._cache))
+
+    def cache_clear(self):
+        """Empty the query result cache and reset its statistics."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+
+    def get_page(
+            self,
+            conditions: List[Tuple[str, str, Any]],
+            logic: Optional[str] = 'AND',
+            after: Optional[Tuple[Any, ...]] = None,
+            page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+            order_by: Optional[Tuple[str, ...]] = ("date", "id"),
+            descending: Optional[bool] = True,
+    ) -> List[T]:
+        """
+        Retrieve one page of the objects that match the given conditions, using keyset pagination.
+
+        :param conditions: Conditions in the same form as for `get_by_conditions`.
+        :param logic: Logical operator to combine conditions ('AND' or 'OR'). Default is 'AND'.
+        :param after: The `order_by` values of the last object of the previous page, None for the first page.
+        :param page_size: Maximum number of objects in the page.
+        :param order_by: Fields the pages are ordered by, they should end with a unique field.
+        :param descending: Whether the pages go from the highest to the lowest values.
+        :return: List of objects of type T.
+        """
+        for field_name in order_by:
+            if field_name not in self._field_serializers:
+                raise ValueError(f"Invalid field name '{field_name}' in order by.")
+
+        where_sql, params = self._build_where_clause(conditions, logic)
+        where_clauses = [f"({where_sql.removeprefix(' WHERE ')})"] if where_sql else []
+        if after is not None:
+            # Row values compare lexicographically, which is exactly the keyset order.
+            where_clauses.append(
+                f"({', '.join(order_by)}) {'<' if descending else '>'} ({', '.join('?' for _ in order_by)})"
+            )
+            params.extend(self._field_serializers[name](value) for name, value in zip(order_by, after))
+        direction = "DESC" if descending else "ASC"
+
+        query_sql = f"SELECT {self._columns_sql} FROM {self.table_name}"
+        if where_clauses:
+            query_sql += f" WHERE {' AND '.join(where_clauses)}"
+        query_sql += f" ORDER BY {', '.join(f'{name} {direction}' for name in order_by)} LIMIT ?"
+        params.append(page_size)
+
+        rows = self._fetch_rows(("sql", query_sql, tuple(params)), query_sql, params)
+        return list(map(self._row_decoder, rows))
+
+    def sum_by(
+            self,
+            field_name: str,
+            conditions: Optional[List[Tuple[str, str, Any]]] = None,
+            logic: Optional[str] = 'AND',
+            group_by: Optional[List[Union[str, Tuple[str, str]]]] = None,
+            weight_by: Optional[Tuple[str, Dict[Any, float]]] = None,
+    ) -> Union[float, Dict[Tuple[Any, ...], float]]:
+        """
+        Sum a numeric field in SQLite, without materializing any object.
+
+        :param field_name: The field to sum, amounts stored in minor units are returned as amounts.
+        :param conditions: Optional conditions, in the same form as for `get_by_conditions`.
+        :param logic: Logical operator to combine conditions ('AND' or 'OR'). Default is 'AND'.
+        :param group_by: Optional field names to group the sums by, or (field_name, date_part) pairs to group a
+                         date field by one of the `DATE_PARTS`, whose group values are the keys, e.g. 2024-02-16.
+        :param weight_by: Optional (field_name, {value: factor}) pair, each row is multiplied by the
+                          factor of its value in that field, rows with other values have a factor of 1.
+        :return: The total, or a dict mapping each tuple of group values to its total when grouping.
+        """
+        group_by = [(group, None) if isinstance(group, str) else tuple(group) for group in group_by or []]
+        for name in [field_name, *(name for name, _ in group_by)]:
+            if name not in self._field_serializers:
+                raise ValueError(f"Invalid field name '{name}' in aggregation.")
+        for name, date_part in group_by:
+            if date_part is not None and date_part not in DATE_PARTS:
+                raise ValueError(f"Invalid date part '{date_part}' of '{name}'. Use one of {list(DATE_PARTS)}.")
+        group_expressions = [
+            DATE_PARTS[date_part].format(name) if date_part is not None else name for name, date_part in group_by
+        ]
+
         params = []
+        sum_expression = field_name
+        if weight_by:
+            weight_field_name, factors = weight_by
+            if weight_field_name not in self._field_serializers:
+                raise ValueError(f"Invalid field name '{weight_field_name}' in aggregation weights.")
+            when_clauses = []
+            for value, factor in factors.items():
+                when_clauses.append("WHEN ? THEN ?")
+                params.extend([self._field_serializers[weight_field_name](value), factor])
+            if when_clauses:
+                sum_expression = f"{field_name} * CASE {weight_field_name} {' '.join(when_clauses)} ELSE 1 END"
 
-        for field_name, operator, value in conditions:
-            if field_name not in valid_fields:
-                raise ValueError(f"Invalid field name '{field_name}' in conditions.")
-            if operator.upper() not in ('=', '!=', '<', '>', '<=', '>=', 'LIKE'):
-                raise ValueError(f"Invalid operator '{operator}' in conditions.")
-            where_clauses.append(f"{field_name} {operator} ?")
-            field_type = next(f.type for f in fields(self.model_class) if f.name == field_name)
-            serialized_value = self._serialize_field(value, field_type)
-            params.append(serialized_value)
+        where_sql, where_params = self._build_where_clause(conditions or [], logic)
+        params.extend(where_params)
+        select_columns = [*group_expressions, f"TOTAL({sum_expression})"]
+        query_sql = f"SELECT {', '.join(select_columns)} FROM {self.table_name}{where_sql}"
+        if group_by:
+            query_sql += f" GROUP BY {', '.join(group_expressions)}"
 
-        where_sql = f" {logic} ".join(where_clauses)
-        query_sql = f"SELECT * FROM {self.table_name} WHERE {where_sql}"
+        rows = self._fetch_rows(("sql", query_sql, tuple(params)), query_sql, params)
+        if not group_by:
+            return self._decode_total(field_name, rows[0][0])
 
-        cursor = self.conn.execute(query_sql, params)
-        rows = cursor.fetchall()
-        return [self._row_to_object(row, self.model_class) for row in rows]
+        # Date part keys are returned as they are, not as dates.
+        deserializers = [
+            self._field_deserializers[name] if date_part is None else None for name, date_part in group_by
+        ]
+        totals = {}
+        for *group_values, total in rows:
+            key = tuple(
+                deserializer(value) if deserializer is not None and value is not None else value
+                for deserializer, value in zip(deserializers, group_values)
+            )
+            totals[key] = self._decode_total(field_name, total)
+        return totals
+
+    def _decode_total(self, field_name: str, total: float) -> float:
+        if field_name in self._minor_units_fields:
+            return self._from_minor_units(total)
+        return total
+
+    def explain_query_plan(self, conditions: List[Tuple[str, str, Any]], logic: Optional[str] = 'AND') -> List[str]:
+        """
+        Return the SQLite query plan of `get_by_conditions` for the given conditions.
+
+        Useful to check that a query is served by an index, in which case one of the
+        returned lines reads like 'SEARCH transactions USING INDEX idx_transactions_type_date_id (...)'.
+        """
+        query_sql, params = self._build_conditions_query(conditions, logic)
+        return [detail for _, _, _, detail in self._read_rows(f"EXPLAIN QUERY PLAN {query_sql}", params)]
 
-    def _row_to_object(self, row: sqlite3.Row, model_class: Type[T]) -> T:
+    def _build_conditions_query(
+            self, conditions: List[Tuple[str, str, Any]], logic: Optional[str] = 'AND'
+    ) -> Tuple[str, List[Any]]:
+        return self._query_builder.select(conditions, logic)
+
+    def _build_where_clause(
+            self, conditions: List[Tuple[str, str, Any]], logic: Optional[str] = 'AND'
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause, with a leading space, and its parameters; empty without conditions."""
+        return self._query_builder.where(conditions, logic)
+
+    def _row_to_object(self, row: Tuple[Any, ...]) -> T:
         """Convert a database row to an object of type T."""
-        init_args = {}
-        for field in fields(model_class):
-            value = row[field.name]
-            init_args[field.name] = self._deserialize_field(value, field.type)
-        return model_class(**init_args)
+        return self._row_decoder(row)
+
+    def _compile_row_decoder(self, model_class: Type[T]) -> Callable[[Tuple[Any, ...]], T]:
+        """
+        Build a function that maps a row tuple, in field order, to an object of type T.
+
+        Field types are resolved to deserializers once here, so decoding a row only
+        applies the pre-bound converters to the columns that need one.
+        """
+        converters = tuple(
+            (index, deserializer)
+            for index, field in enumerate(fields(model_class))
+            if (deserializer := self._get_field_deserializer(field)) is not None
+        )
+
+        def decode(row: Tuple[Any, ...]) -> T:
+            values = list(row)
+            for index, deserializer in converters:
+                value = values[index]
+                if value is not None:
+                    values[index] = deserializer(value)
+            return model_class(*values)
+
+        return decode
+
+    def _get_column_type(self, field: Field) -> str:
+        """Map a dataclass field to its SQLite column type."""
+        if field.metadata.get(MINOR_UNITS):
+            return 'INTEGER'
+        return self._get_sqlite_type(field.type)
 
     def _get_sqlite_type(self, py_type: Any) -> str:
         """Map Python types to SQLite types."""
-        origin_type = getattr(py_type, '__origin__', None)
-        if origin_type is Optional:
-            args = getattr(py_type, '__args__', [])
+        origin_type = get_origin(py_type)
+        if origin_type is Union:  # Optional[X] is Union[X, None].
+            args = get_args(py_type)
             if args:
                 py_type = args[0]
         if py_type in (int, 'int'):
@@ -158,31 +600,58 @@ class BaseRepository:
         else:
             return value
 
-    def _deserialize_field(self, value: Any, field_type: Any) -> Any:
-        """Deserialize a field value when retrieving it from the database."""
-        if value is None:
+    def _get_field_serializer(self, field: Field) -> Callable[[Any], Any]:
+        """Resolve the function that serializes values of the given field before storing them."""
+        if field.metadata.get(MINOR_UNITS):
+            return self._to_minor_units
+        return lambda value: self._serialize_field(value, field.type)
+
+    @staticmethod
+    def _to_minor_units(value: Any) -> Optional[int]:
+        """Convert an amount, given as a number or a numeric string, into integer minor units."""
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
             return None
-        origin_type = getattr(field_type, '__origin__', None)
-        actual_type = field_type
+        try:
+            amount = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount '{value}', it should be a number.")
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount '{value}', it should be a finite number.")
+        return int((amount * MINOR_UNITS_FACTOR).to_integral_value(rounding=ROUND_HALF_UP))
+
+    @staticmethod
+    def _from_minor_units(value: int) -> float:
+        """Convert integer minor units back into an amount."""
+        return value / MINOR_UNITS_FACTOR
+
+    def _get_field_deserializer(self, field: Field) -> Optional[Callable[[Any], Any]]:
+        """
+        Resolve the function that deserializes values of the given field when
+        retrieving them from the database. None means the value is used as stored.
+        """
+        if field.metadata.get(MINOR_UNITS):
+            return self._from_minor_units
+
+        actual_type = field.type
 
         if get_origin(actual_type) == Union:
             actual_type = get_args(actual_type)[0]
 
         if inspect.isclass(actual_type) and issubclass(actual_type, Enum):
-            return actual_type(value)
+            return actual_type
         elif actual_type is datetime:
-            return datetime.fromisoformat(value)
+            return datetime.fromisoformat
         elif actual_type is bool:
-            return bool(value)
+            return bool
         elif actual_type is int:
-            return int(value)
+            return int
         elif actual_type is float:
-            return float(value)
-        elif actual_type is str:
-            return value
+            return float
         else:
-            return value
+            return None
 
     def close(self):
-        """Close the database connection."""
-        self.conn.close()
+        """Close the database connections."""
+        self.pool.close()
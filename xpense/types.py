@@ -1,12 +1,14 @@
 import dataclasses
 from datetime import datetime
 import uuid
-from typing import Callable, Self, Optional
+from typing import Callable, Self, Optional, ClassVar, Tuple
 
 import flet as ft
 import flet_route
 from enum import Enum
 
+from xpense.database.sqlite_repository import MINOR_UNITS
+
 flet_route_callable_type = Callable[[ft.Page, flet_route.Params, flet_route.Basket], ft.View]
 
 
@@ -90,8 +92,31 @@ class TransactionOperations(Enum):
 class Transaction:
     type: Optional[TransactionType] = None
     date: Optional[datetime] = None
-    amount: Optional[str] = None
+    amount: Optional[float] = dataclasses.field(default=None, metadata={MINOR_UNITS: True})
     currency: Optional[Currency] = None
     category: Optional[str] = None
     aggregation: Optional[DataAggregation] = None
     id: Optional[str] = dataclasses.field(default_factory=uuid4_factory)
+
+    # Secondary indexes created by the repository, one tuple of column names per index.
+    __indexes__: ClassVar[Tuple[Tuple[str, ...], ...]] = (
+        ("type", "date", "id"),
+    )
+
+
+@dataclasses.dataclass
+class TransactionTotal:
+    """Total of the transactions sharing a week, month or year, type, category, currency and aggregation."""
+    granularity: Optional[DataAggregation] = None
+    period: Optional[str] = None
+    type: Optional[TransactionType] = None
+    category: Optional[str] = None
+    currency: Optional[Currency] = None
+    aggregation: Optional[DataAggregation] = None
+    amount: Optional[float] = dataclasses.field(default=None, metadata={MINOR_UNITS: True})
+    count: Optional[int] = None
+    id: Optional[str] = None
+
+    __indexes__: ClassVar[Tuple[Tuple[str, ...], ...]] = (
+        ("type", "granularity", "period"),
+    )
@@ -1,5 +1,10 @@
+import calendar
 import datetime
+import functools
 from math import copysign
+from typing import Tuple
+
+MONTH_MATRIX_CACHE_SIZE = 48
 
 
 def get_sign(x):
@@ -14,3 +19,15 @@ def convert_string_into_datetime(datetime_str: str) -> datetime.datetime:
 def convert_datetime_to_string(dt: datetime.datetime) -> str:
     """Converts a datetime object to a string of form 2024-02-16 00:00:00"""
     return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@functools.lru_cache(maxsize=MONTH_MATRIX_CACHE_SIZE)
+def get_month_matrix(year: int, month: int) -> Tuple[Tuple[int, ...], ...]:
+    """Returns `calendar.monthcalendar` of the month as tuples, 0 for days of the adjacent months, computed once."""
+    return tuple(tuple(week) for week in calendar.monthcalendar(year, month))
+
+
+def shift_month(year: int, month: int, months: int) -> Tuple[int, int]:
+    """Returns the (year, month) the given number of months after the month, or before it when negative."""
+    month_index = year * 12 + month - 1 + months
+    return month_index // 12, month_index % 12 + 1
@@ -1,8 +1,9 @@
 from datetime import datetime
+from typing import Union
 
 
-def round_to_two_decimals(value: str) -> str:
-    # Convert the string to a float
+def round_to_two_decimals(value: Union[str, float]) -> str:
+    # Convert the string or number to a float
     number = float(value)
 
     # Round to 2 decimal places
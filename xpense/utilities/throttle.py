@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Any, Optional
+
+DEFAULT_THROTTLE_INTERVAL = 0.1  # Seconds.
+
+
+class Throttle:
+    """Coalesces frequent events, like scroll events, into at most one handler call per interval.
+
+    The first event runs the handler right away. Events arriving within the interval are
+    coalesced, and only the latest one runs the handler once the interval has passed, so the
+    final state is never missed. Handler calls never overlap.
+
+    Trailing calls run on a single worker thread, kept for the life of the throttle, so that the
+    handler always runs on the same thread, and e.g. reuses the database connection of that thread.
+
+    Args:
+        handler: The function called with the event.
+        interval: The minimum time between two handler calls, in seconds.
+        executor: The executor the trailing calls run on, by default a single worker owned by this throttle.
+    """
+
+    def __init__(
+            self,
+            handler: Callable[[Any], None],
+            interval: Optional[float] = DEFAULT_THROTTLE_INTERVAL,
+            executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self._handler = handler
+        self._interval = interval
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="xpense-throttle")
+
+        self._lock = threading.Lock()
+        self._handler_lock = threading.Lock()
+        self._last_call_time = float("-inf")
+        self._pending_event: Any = None
+        self._token = 0  # Identifies the scheduled trailing call, the cancelled ones do nothing.
+        self._scheduled = False
+
+    def __call__(self, event: Any) -> None:
+        with self._lock:
+            remaining_time = self._last_call_time + self._interval - time.monotonic()
+            if remaining_time > 0 or self._scheduled:
+                # Keep only the latest event for the trailing call.
+                self._pending_event = event
+                if not self._scheduled:
+                    self._scheduled = True
+                    self._executor.submit(self._call_pending, self._token, remaining_time)
+                return
+            self._last_call_time = time.monotonic()
+        self._call(event)
+
+    def _call_pending(self, token: int, delay: float) -> None:
+        time.sleep(delay)
+        with self._lock:
+            if token != self._token:
+                return
+            event = self._pending_event
+            self._pending_event = None
+            self._token += 1
+            self._scheduled = False
+            self._last_call_time = time.monotonic()
+        self._call(event)
+
+    def _call(self, event: Any) -> None:
+        with self._handler_lock:
+            self._handler(event)
+
+    def cancel(self) -> None:
+        """Drops the pending trailing call, if any."""
+        with self._lock:
+            self._token += 1
+            self._scheduled = False
+            self._pending_event = None
@@ -1,16 +1,35 @@
 import calendar
 import datetime
-from typing import List, Optional, Callable, Tuple
+from typing import List, Optional, Callable, Dict
 
 import flet as ft
 from flet_core import IconButton
 
-from xpense.utilities.calendar import get_sign
+from xpense.database.repository_container import RepositoryContainer
+from xpense.utilities.calendar import get_month_matrix, shift_month
+from xpense.utilities.common import round_to_two_decimals
 from xpense.views.calendar.components import get_header_current_day_button, get_header_calendar_icon
+from xpense.views.calendar.month_prefetcher import MonthPrefetcher
+from xpense.views.calendar.spending_fetcher import DailySpendingFetcher
+
+# The day containers of the grid, enough for the longest months, which span 6 weeks.
+WEEKS_PER_MONTH_GRID = 6
+DAYS_PER_WEEK = 7
+
+# Days with expenses are tinted with the heat color, from the lowest opacity for the smallest
+# spending up to the highest one for the day spending the most in the month.
+HEAT_COLOR = ft.colors.RED_400
+MIN_HEAT_OPACITY = 0.15
+MAX_HEAT_OPACITY = 0.75
 
 
 class CalendarBuilder:
-    def __init__(self, start_date: Optional[datetime.date] = None):
+    def __init__(
+            self,
+            start_date: Optional[datetime.date] = None,
+            spending_fetcher: Optional[DailySpendingFetcher] = None,
+            month_prefetcher: Optional[MonthPrefetcher] = None,
+    ):
         if start_date is None:
             self._start_date = datetime.date.today()
         else:
@@ -22,7 +41,18 @@ class CalendarBuilder:
 
         self._date_clicks: List[ft.Container] = []
 
+        # The grid controls are built once and re-labelled in place for each month, so that
+        # navigating only sends the changed properties to the client.
         self._calendar_grid: Optional[ft.Column] = None
+        self._month_label: Optional[ft.Container] = None
+        self._week_rows: List[ft.Row] = []
+        self._day_containers: Dict[int, ft.Container] = {}  # The containers of the current month by day.
+        self._day_border = ft.border.all(0.5, ft.colors.BLACK54)
+
+        self._spending_fetcher = spending_fetcher
+        self._daily_spending: Dict[int, float] = {}
+        self._max_daily_spending = 0.0
+        self._month_prefetcher = month_prefetcher
 
     def _build_calendar_grid(self):
         if self._calendar_grid:
@@ -33,9 +63,6 @@ class CalendarBuilder:
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
         )
 
-    def _reset_calendar_grid_controls(self):
-        self._calendar_grid.controls = []
-
     def _get_navigation_buttons(self) -> tuple[IconButton, IconButton]:
         before_button = PaginationButton(
             "before",
@@ -82,13 +109,14 @@ class CalendarBuilder:
         ]
 
     def _build_calendar(self) -> None:
+        if self._calendar_grid:
+            return
         self._build_calendar_grid()
-        self._reset_calendar_grid_controls()
 
         # This is the label that goes at the top of the
         # weekday labels.
-        month_label = self._get_month_label()
-        month_grid = self._get_basic_month_grid(month_label)
+        self._month_label = self._get_month_label()
+        month_grid = self._get_basic_month_grid(self._month_label)
         self._calendar_grid.controls.append(month_grid)
 
         # Build the weekday row which is singular, and it looks like
@@ -101,31 +129,96 @@ class CalendarBuilder:
         )
         self._calendar_grid.controls.append(weekday_row)
 
-        # Add the week containers with each day of the month
+        # Add the week rows of the day containers, labelled by `_render_calendar`,
         # to the root calendar grid.
-        month_matrix = calendar.monthcalendar(self._current_year, self._current_month)
-        for week in month_matrix:
-            week_container = ft.Row(
+        for _ in range(WEEKS_PER_MONTH_GRID):
+            week_row = ft.Row(
+                controls=[self._get_day_container() for _ in range(DAYS_PER_WEEK)],
                 vertical_alignment=ft.CrossAxisAlignment.CENTER,
                 alignment=ft.MainAxisAlignment.CENTER,
             )
-            for day in week:
-                day_container = self._get_day_container(day)
-                day_label = ft.Text(str(day), size=12) if day != 0 else None
-                day_container.content = day_label
-
-                if (
-                        day == self._start_date.day and
-                        self._current_month == self._start_date.month and
-                        self._current_year == self._start_date.year
-                ):
-                    day_container.bgcolor = ft.colors.TEAL_700
-
-                week_container.controls.append(day_container)
-            self._calendar_grid.controls.append(week_container)
+            self._week_rows.append(week_row)
+            self._calendar_grid.controls.append(week_row)
+
+    def _render_calendar(self) -> None:
+        """Labels the grid controls with the current month, the weeks it does not span are hidden."""
+        self._date_clicks = []
+        self._month_label.content.value = f"{calendar.month_name[self._current_month]} {self._current_year}"
+
+        month_matrix = get_month_matrix(self._current_year, self._current_month)
+        self._day_containers = {}
+        for week_index, week_row in enumerate(self._week_rows):
+            week_row.visible = week_index < len(month_matrix)
+            week = month_matrix[week_index] if week_row.visible else (0,) * DAYS_PER_WEEK
+            for day_container, day in zip(week_row.controls, week):
+                self._set_day(day_container, day)
+                if day != 0:
+                    self._day_containers[day] = day_container
+        self._render_spending()
+        self._prefetch_adjacent_months()
+
+    def _set_day(self, day_container: ft.Container, day: int) -> None:
+        day_container.data = day if day != 0 else None
+        day_container.content.value = str(day) if day != 0 else ""
+        day_container.border = self._day_border if day != 0 else None
+        day_container.bgcolor = None
+        day_container.tooltip = None
+
+    def _render_spending(self) -> None:
+        """Colors the days of the current month by their expenses, the selected day keeps its color."""
+        if self._spending_fetcher is not None:
+            self._daily_spending = self._spending_fetcher.get_month(self._current_year, self._current_month)
+        self._max_daily_spending = max(self._daily_spending.values(), default=0.0)
+
+        for day, day_container in self._day_containers.items():
+            spending = self._daily_spending.get(day)
+            day_container.tooltip = round_to_two_decimals(spending) if spending else None
+            if day_container not in self._date_clicks:
+                day_container.bgcolor = self._get_day_color(day)
+
+    def _prefetch_adjacent_months(self) -> None:
+        """Prefetches the months before and after the current one, first the one in the direction of the paging."""
+        if self._month_prefetcher is None:
+            return
+        previous_month = shift_month(self._current_year, self._current_month, -1)
+        next_month = shift_month(self._current_year, self._current_month, 1)
+        paging_back = (self._current_year, self._current_month) < (
+            self._current_year_backup, self._current_month_backup
+        )
+        months = [previous_month, next_month] if paging_back else [next_month, previous_month]
+        self._month_prefetcher.prefetch([(year, month) for year, month in months if year > 0])
+
+    def refresh_spending(self) -> None:
+        """
+        Re-colors the days when transactions were written since the month was rendered, e.g. from another view.
+        Nothing is sent to the client, it is meant to be called before the calendar is shown again.
+        """
+        if (
+                self._calendar_grid is not None and self._spending_fetcher is not None and
+                self._spending_fetcher.is_stale(self._current_year, self._current_month)
+        ):
+            self._render_spending()
+
+    def _get_day_color(self, day: int) -> Optional[str]:
+        if self._is_start_date(day):
+            return ft.colors.TEAL_700
+        spending = self._daily_spending.get(day, 0.0)
+        if spending <= 0 or self._max_daily_spending <= 0:
+            return None
+        heat = spending / self._max_daily_spending
+        opacity = MIN_HEAT_OPACITY + (MAX_HEAT_OPACITY - MIN_HEAT_OPACITY) * heat
+        return ft.colors.with_opacity(round(opacity, 2), HEAT_COLOR)
+
+    def _is_start_date(self, day: int) -> bool:
+        return (
+                day == self._start_date.day and
+                self._current_month == self._start_date.month and
+                self._current_year == self._start_date.year
+        )
 
     def get(self):  # -> ft.Column:
         self._build_calendar()
+        self._render_calendar()
         return ft.Container(
             alignment=ft.alignment.top_left,
             bgcolor=ft.colors.AMBER_100,
@@ -140,113 +233,92 @@ class CalendarBuilder:
     def _calendar_needs_reset(self) -> bool:
         return self._current_year != self._current_year_backup or self._current_month != self._current_month_backup
 
-    def reset_calendar(self) -> None:
-        if self._calendar_needs_reset():
-            self._build_calendar()
-            self._calendar_grid.update()
-            self._date_clicks = []
+    def navigate_to(self, year: int, month: int, day: Optional[int] = None) -> None:
+        """
+        Shows the month, months out of 1-12 carrying over to the years, and selects the day if any.
+        All the changes are applied first and sent to the client in a single update.
+        """
+        year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+        if year > 0:
+            self._current_year = year
+            self._current_month = month
+
+        needs_update = self._calendar_needs_reset()
+        if needs_update:
+            self._render_calendar()
             self._sync_current_dates()
 
-    @staticmethod
-    def _get_relative_delta(months: int) -> Tuple[int, int]:
-        if not isinstance(months, int):
-            raise TypeError("months should be integers.")
-        sign = get_sign(months)
-        div, mod = divmod(months * sign, 12)
-        relative_months = mod * sign
-        relative_years = div * sign
-        return relative_months, relative_years
+        day_container = self._day_containers.get(day)
+        if day_container is not None:
+            needs_update |= bool(self._select_day(day_container, toggle=False))
+
+        if needs_update:
+            self._calendar_grid.update()
 
     def shift(self, years: Optional[int] = 0, months: Optional[int] = 0) -> None:
         if not isinstance(years, int) or not isinstance(months, int):
             raise TypeError("years and months should be integers.")
-
-        if abs(months) > 11:
-            relative_months, relative_years = self._get_relative_delta(months)
-            months = relative_months
-            years += relative_years
-
-        if months:
-            self.set_current_month(self._current_month + months)
-
-        if years:
-            self.set_current_year(self._current_year + years)
-
-        self.reset_calendar()
+        self.navigate_to(self._current_year + years, self._current_month + months)
 
     def set_current_month(self, month: int) -> None:
-        if 1 <= month <= 12:
-            self._current_month = month
-        elif month > 12 or month <= 0:
-            relative_months, relative_years = self._get_relative_delta(month)
-            self.set_current_month(relative_months if relative_months != 0 else 12)
-            relative_years = relative_years if relative_years != 0 else -1
-            self.set_current_year(self._current_year + relative_years)
-        self.reset_calendar()
+        self.navigate_to(self._current_year, month)
 
     def set_current_year(self, year: int) -> None:
-        if year > 0:
-            self._current_year = year
-        self.reset_calendar()
+        self.navigate_to(year, self._current_month)
 
     def go_today(self) -> None:
-        self.set_current_year(self._start_date.year)
-        self.set_current_month(self._start_date.month)
-        self.highlight_day(self._start_date.day)
+        self.navigate_to(self._start_date.year, self._start_date.month, self._start_date.day)
 
     def highlight_day(self, target_day: int) -> None:
-        for week_control in self._calendar_grid.controls:
-            for day_control in week_control.controls:
-                if day_control.data == target_day:
-                    day_control: ft.Container
-                    self._click_date(ft.ControlEvent(control=day_control, target="", name="", data="", page=""))
+        self.navigate_to(self._current_year, self._current_month, target_day)
 
     def pick_date(self, target_date: datetime.datetime) -> None:
-        self.set_current_month(target_date.month)
-        self.set_current_year(target_date.year)
-        self.highlight_day(target_date.day)
+        self.navigate_to(target_date.year, target_date.month, target_date.day)
 
-    def _click_date(self, event: ft.ControlEvent) -> None:
-        clicked_date = event.control
+    def _get_unselected_color(self, day_container: ft.Container) -> str:
+        return self._get_day_color(day_container.data) or ft.colors.WHITE
 
-        # Determine color based on the date
-        def target_color(date):
-            is_current_date = int(date.content.value) == self._start_date.day
-            return ft.colors.TEAL_700 if is_current_date else ft.colors.WHITE
-
-        # Toggle or set color for clicked date
-        if self._date_clicks and clicked_date == self._date_clicks[0]:
+    def _select_day(self, day_container: ft.Container, toggle: Optional[bool] = True) -> List[ft.Container]:
+        """Selects the day, or unselects it when toggled while selected, and returns the changed containers."""
+        if self._date_clicks and day_container == self._date_clicks[0]:
+            if not toggle and day_container.bgcolor == ft.colors.BLUE_600:
+                return []
             # Toggle if same date clicked again
-            new_color = ft.colors.BLUE_600 if clicked_date.bgcolor != ft.colors.BLUE_600 else target_color(clicked_date)
-        else:
-            # Reset previous date's color if different date clicked
-            if self._date_clicks:
-                self._date_clicks[0].bgcolor = target_color(self._date_clicks[0])
-                self._date_clicks[0].update()
+            if day_container.bgcolor != ft.colors.BLUE_600:
+                day_container.bgcolor = ft.colors.BLUE_600
+            else:
+                day_container.bgcolor = self._get_unselected_color(day_container)
+            return [day_container]
+
+        changed_containers = [day_container]
+        # Reset previous date's color if different date clicked
+        if self._date_clicks:
+            self._date_clicks[0].bgcolor = self._get_unselected_color(self._date_clicks[0])
+            changed_containers.append(self._date_clicks[0])
+
+        day_container.bgcolor = ft.colors.BLUE_600
+        # Update or set the clicked date in the list
+        self._date_clicks = [day_container]
+        return changed_containers
 
-            new_color = ft.colors.BLUE_600
-            # Update or set the clicked date in the list
-            self._date_clicks = [clicked_date]
+    def _click_date(self, event: ft.ControlEvent) -> None:
+        clicked_date = event.control
+        if clicked_date.data is None:
+            # Days of the adjacent months are blank.
+            return
 
-        clicked_date.bgcolor = new_color
-        clicked_date.update()
+        for day_container in self._select_day(clicked_date):
+            day_container.update()
 
-    def _get_day_container(self, day: int) -> ft.Container:
-        if day == 0:
-            return ft.Container(
-                width=28,
-                height=28
-            )
-        else:
-            return ft.Container(
-                width=28,
-                height=28,
-                border=ft.border.all(0.5, ft.colors.BLACK54),
-                alignment=ft.alignment.center,
-                data=day,
-                on_click=lambda event: self._click_date(event),
-                animate=150
-            )
+    def _get_day_container(self) -> ft.Container:
+        return ft.Container(
+            width=28,
+            height=28,
+            alignment=ft.alignment.center,
+            content=ft.Text(size=12),
+            on_click=lambda event: self._click_date(event),
+            animate=150
+        )
 
 
 class PaginationButton:
@@ -275,13 +347,21 @@ class PaginationButton:
 
 
 class CalendarNavigator:
-    def __init__(self, page: ft.Page, start_date: Optional[datetime.date] = None):
+    def __init__(
+            self,
+            page: ft.Page,
+            start_date: Optional[datetime.date] = None,
+            repository_container: Optional[RepositoryContainer] = None,
+    ):
         if start_date is None:
             self.start_date = datetime.date.today()
         else:
             self.start_date = start_date
 
-        self.calendar_builder = CalendarBuilder(self.start_date)
+        # Without repositories, the calendar shows no spending.
+        spending_fetcher = DailySpendingFetcher(repository_container) if repository_container else None
+        self.month_prefetcher = MonthPrefetcher(spending_fetcher)
+        self.calendar_builder = CalendarBuilder(self.start_date, spending_fetcher, self.month_prefetcher)
 
         self.header_text = ft.Text(
             value=self.start_date.strftime("%B %d, %Y"),
@@ -366,10 +446,16 @@ class CalendarNavigator:
             ],
         )
 
+    def refresh(self) -> None:
+        """Brings the shown data up to date, before the calendar is shown again."""
+        self.calendar_builder.refresh_spending()
+
+    def close(self) -> None:
+        """Stops the background prefetch, before the repositories it reads are closed."""
+        self.month_prefetcher.shutdown()
 
-def get_main_container(page: ft.Page, start_date: datetime.date) -> ft.Container:
-    calendar_navigator = CalendarNavigator(page, start_date)
 
+def get_main_container(calendar_navigator: CalendarNavigator) -> ft.Container:
     return ft.Container(
         alignment=ft.alignment.top_left,
         expand=True,
@@ -386,7 +472,7 @@ def get_main_container(page: ft.Page, start_date: datetime.date) -> ft.Container
     )
 
 
-def get_calendar_controls(page: ft.Page, start_date: datetime.date) -> List[ft.Control]:
+def get_calendar_controls(calendar_navigator: CalendarNavigator) -> List[ft.Control]:
     return [
-        get_main_container(page, start_date)
+        get_main_container(calendar_navigator)
     ]
@@ -0,0 +1,54 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, List, Tuple
+
+from xpense.utilities.calendar import get_month_matrix
+from xpense.views.calendar.spending_fetcher import DailySpendingFetcher
+
+
+class MonthPrefetcher:
+    """
+    Computes the grids and the daily spending of months on a background thread, into their caches, so that
+    paging to the months around the shown one finds them ready instead of computing them in the click handler.
+
+    Each prefetch supersedes the previous one: its months that are not computed yet are skipped.
+    """
+
+    def __init__(
+            self,
+            spending_fetcher: Optional[DailySpendingFetcher] = None,
+            executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """
+        :param spending_fetcher: The fetcher whose daily spending is prefetched, None to only prefetch the grids.
+        :param executor: The executor the months are computed on, by default a single worker owned by this
+                         prefetcher, which keeps the database reads of the prefetch one at a time.
+        """
+        self._spending_fetcher = spending_fetcher
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="xpense-prefetch")
+        self._lock = threading.Lock()
+        self._token = 0  # Identifies the latest prefetch, the older ones stop at their next month.
+        self._future: Optional[Future] = None
+
+    def prefetch(self, months: List[Tuple[int, int]]) -> Future:
+        """Computes the (year, month) months in the background, in order, and cancels the previous prefetch."""
+        with self._lock:
+            self._token += 1
+            if self._future is not None:
+                self._future.cancel()
+            self._future = self._executor.submit(self._prefetch, self._token, months)
+            return self._future
+
+    def _prefetch(self, token: int, months: List[Tuple[int, int]]) -> None:
+        for year, month in months:
+            if token != self._token:
+                return
+            get_month_matrix(year, month)
+            if self._spending_fetcher is not None:
+                self._spending_fetcher.get_month(year, month)
+
+    def shutdown(self, wait: Optional[bool] = True):
+        """Stop the executor, once the running prefetch is done if `wait`."""
+        with self._lock:
+            self._token += 1
+        self._executor.shutdown(wait=wait, cancel_futures=True)
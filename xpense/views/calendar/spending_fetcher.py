@@ -0,0 +1,77 @@
+import datetime
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+from xpense.database.repository_container import RepositoryContainer
+from xpense.types import TransactionType
+
+# Months whose daily spending is kept, enough to browse two years back and forth without a query.
+SPENDING_CACHE_SIZE = 24
+
+
+class DailySpendingFetcher:
+    """
+    The expenses of each day of a month, summed by SQLite in a single grouped query, and kept per
+    (year, month) until the next write to the transactions.
+
+    Each month is fetched by one thread at a time, so a month requested while the prefetcher fetches it
+    waits for that query instead of running its own, while the other months are fetched in parallel.
+    """
+
+    def __init__(self, repository_container: RepositoryContainer):
+        self._rc = repository_container
+        self._cache: OrderedDict[Tuple[int, int], Tuple[int, Dict[int, float]]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._month_locks: Dict[Tuple[int, int], threading.Lock] = {}
+
+    @staticmethod
+    def get_month_bounds(year: int, month: int) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Returns the [start, end) datetimes of the month."""
+        month_start = datetime.datetime(year, month, 1)
+        return month_start, month_start + relativedelta(months=1)
+
+    def get_month(self, year: int, month: int) -> Dict[int, float]:
+        """Returns the total expenses of each day of the month, days without any are left out."""
+        with self._cache_lock:
+            month_lock = self._month_locks.setdefault((year, month), threading.Lock())
+        with month_lock:
+            return self._get_month(year, month)
+
+    def _get_month(self, year: int, month: int) -> Dict[int, float]:
+        # Read before the query, so that a write made meanwhile leaves the result stale.
+        generation = self._rc.transactions.generation
+        with self._cache_lock:
+            cached = self._cache.get((year, month))
+            if cached is not None and cached[0] == generation:
+                self._cache.move_to_end((year, month))
+                return cached[1]
+
+        month_start, month_end = self.get_month_bounds(year, month)
+        totals = self._rc.transactions.sum_by(
+            "amount",
+            conditions=[
+                ("type", "=", TransactionType.EXPENSE),
+                ("date", ">=", month_start),
+                ("date", "<", month_end),
+            ],
+            group_by=[("date", "day")],
+        )
+        # The day keys are ISO dates, e.g. 2024-02-16.
+        daily_spending = {int(day_key[8:10]): total for (day_key,), total in totals.items() if total}
+
+        with self._cache_lock:
+            self._cache[(year, month)] = (generation, daily_spending)
+            self._cache.move_to_end((year, month))
+            while len(self._cache) > SPENDING_CACHE_SIZE:
+                evicted_month, _ = self._cache.popitem(last=False)
+                self._month_locks.pop(evicted_month, None)
+        return daily_spending
+
+    def is_stale(self, year: int, month: int) -> bool:
+        """Returns whether the transactions were written since the month was fetched, or it never was."""
+        with self._cache_lock:
+            cached = self._cache.get((year, month))
+        return cached is None or cached[0] != self._rc.transactions.generation
@@ -1,10 +1,11 @@
+import dataclasses
 import datetime
 from collections import defaultdict
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union, Tuple, Any
 
 from xpense.database.repository_container import RepositoryContainer
 from xpense.types import DataAggregation
-from xpense.types import Transaction
+from xpense.types import TransactionType
 from xpense.views.household.transaction_fetcher import TransactionFetcher
 
 CONVERSION_FACTORS = {
@@ -18,33 +19,62 @@ CONVERSION_FACTORS = {
 }
 
 
+@dataclasses.dataclass(frozen=True)
+class BalanceSnapshot:
+    expenses: float
+    income: float
+    allocations: float
+    unallocated_expenses: float
+    balance: float
+
+
 class BalanceCalculator:
     def __init__(self, repository_container: RepositoryContainer, current_datetime: datetime.datetime):
+        self._rc = repository_container
         self._transaction_fetcher = TransactionFetcher(repository_container, current_datetime)
 
     @staticmethod
-    def _calculate_total(transactions: List[Transaction], aggregation: DataAggregation) -> float:
-        total_amount = 0
-        for transaction in transactions:
-            amount = float(transaction.amount)
-            key = (transaction.aggregation, aggregation)
-            factor = CONVERSION_FACTORS.get(key, 1)
-            total_amount += amount * factor
-        return total_amount
+    def _get_conversion_factors(aggregation: DataAggregation) -> Dict[DataAggregation, float]:
+        """Returns the factor converting amounts of each aggregation into the given aggregation."""
+        return {
+            source_aggregation: CONVERSION_FACTORS.get((source_aggregation, aggregation), 1)
+            for source_aggregation in DataAggregation
+        }
+
+    def _sum_amounts(
+            self, transaction_type: TransactionType, aggregation: DataAggregation,
+            group_by: Optional[List[str]] = None,
+            weight_by: Optional[Tuple[str, Dict[Any, float]]] = None,
+    ) -> Union[float, Dict[Tuple[Any, ...], float]]:
+        """Sums amounts from the running totals rollups."""
+        return self._rc.transaction_totals.sum_by(
+            conditions=self._transaction_fetcher.get_totals_conditions(transaction_type, aggregation),
+            group_by=group_by,
+            weight_by=weight_by,
+        )
+
+    def _sum_converted_amounts(
+            self, transaction_type: TransactionType, aggregation: DataAggregation,
+            group_by: Optional[List[str]] = None
+    ) -> Union[float, Dict[Tuple[Any, ...], float]]:
+        return self._sum_amounts(
+            transaction_type, aggregation, group_by=group_by,
+            weight_by=("aggregation", self._get_conversion_factors(aggregation)),
+        )
 
     def get_total_expenses(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY) -> float:
-        expense_transactions = self._transaction_fetcher.get_expense_transactions(aggregation)
-        return sum(float(t.amount) for t in expense_transactions)
+        return self._sum_amounts(TransactionType.EXPENSE, aggregation)
 
     def get_total_income(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY) -> float:
-        income_transactions = self._transaction_fetcher.get_income_transactions()
-        return self._calculate_total(income_transactions, aggregation)
+        return self._sum_converted_amounts(TransactionType.INCOME, aggregation)
 
     def get_total_allocations(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY) -> float:
-        allocation_transactions = self._transaction_fetcher.get_allocation_transactions()
-        return self._calculate_total(allocation_transactions, aggregation)
+        return self._sum_converted_amounts(TransactionType.ALLOCATION, aggregation)
 
-    def get_total_unallocated_expenses(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY) -> float:
+    @staticmethod
+    def _calculate_unallocated_expenses(
+            allocation_per_category: Dict[str, float], expense_per_category: Dict[str, float]
+    ) -> float:
         """
         Calculate unallocated expenses based on the following rules:
         - For each category:
@@ -53,19 +83,6 @@ class BalanceCalculator:
             - If there is no allocation, all expenses for that category are unallocated.
         """
         unallocated_expenses = 0.0
-        allocations: List[Transaction] = self._transaction_fetcher.get_allocation_transactions()
-        expenses: List[Transaction] = self._transaction_fetcher.get_expense_transactions(aggregation)
-
-        # Sum allocations and expenses per category.
-        allocation_per_category: Dict[str, float] = defaultdict(float)
-        for alloc in allocations:
-            key = (alloc.aggregation, aggregation)
-            factor = CONVERSION_FACTORS.get(key, 1)
-            allocation_per_category[alloc.category] += float(alloc.amount) * factor
-
-        expense_per_category: Dict[str, float] = defaultdict(float)
-        for exp in expenses:
-            expense_per_category[exp.category] += float(exp.amount)
 
         # Set of all categories involved
         transaction_categories = set(allocation_per_category.keys()).union(set(expense_per_category.keys()))
@@ -83,8 +100,63 @@ class BalanceCalculator:
 
         return unallocated_expenses
 
+    def get_total_unallocated_expenses(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY) -> float:
+        # Sum allocations and expenses per category.
+        allocation_per_category: Dict[str, float] = {
+            category: total
+            for (category,), total in self._sum_converted_amounts(
+                TransactionType.ALLOCATION, aggregation, group_by=["category"]
+            ).items()
+        }
+        expense_per_category: Dict[str, float] = {
+            category: total
+            for (category,), total in self._sum_amounts(
+                TransactionType.EXPENSE, aggregation, group_by=["category"]
+            ).items()
+        }
+        return self._calculate_unallocated_expenses(allocation_per_category, expense_per_category)
+
     def get_total_balance(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY):
-        total_income = self.get_total_income()
-        total_allocations = self.get_total_allocations()
-        total_unallocated_expenses = self.get_total_unallocated_expenses(aggregation)
-        return round(total_income - total_allocations - total_unallocated_expenses, 3)
+        return self.get_snapshot(aggregation).balance
+
+    def get_snapshot(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY) -> BalanceSnapshot:
+        """
+        Computes every overview total from two queries: the income and allocation totals per
+        category and aggregation, and the expenses of the period per category.
+
+        Like `get_total_balance` always did, income and allocations are monthly amounts, while
+        expenses and allocations covering them use the given aggregation.
+        """
+        recurring_totals = self._rc.transaction_totals.sum_by(
+            conditions=[("type", "!=", TransactionType.EXPENSE), ("granularity", "=", DataAggregation.YEARLY)],
+            group_by=["type", "category", "aggregation"],
+        )
+        expense_per_category: Dict[str, float] = {
+            category: total
+            for (category,), total in self._sum_amounts(
+                TransactionType.EXPENSE, aggregation, group_by=["category"]
+            ).items()
+        }
+
+        monthly_factors = self._get_conversion_factors(DataAggregation.MONTHLY)
+        factors = self._get_conversion_factors(aggregation)
+        total_income = 0.0
+        total_allocations = 0.0
+        allocation_per_category: Dict[str, float] = defaultdict(float)
+        for (transaction_type, category, source_aggregation), total in recurring_totals.items():
+            if transaction_type == TransactionType.INCOME:
+                total_income += total * monthly_factors.get(source_aggregation, 1)
+            elif transaction_type == TransactionType.ALLOCATION:
+                total_allocations += total * monthly_factors.get(source_aggregation, 1)
+                allocation_per_category[category] += total * factors.get(source_aggregation, 1)
+
+        total_unallocated_expenses = self._calculate_unallocated_expenses(
+            allocation_per_category, expense_per_category
+        )
+        return BalanceSnapshot(
+            expenses=sum(expense_per_category.values()),
+            income=total_income,
+            allocations=total_allocations,
+            unallocated_expenses=total_unallocated_expenses,
+            balance=round(total_income - total_allocations - total_unallocated_expenses, 3),
+        )
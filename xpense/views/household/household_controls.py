@@ -1,18 +1,26 @@
+import asyncio
 import calendar
+import dataclasses
 import datetime
-from typing import List, Optional, Callable, Tuple
+import functools
+import inspect
+from typing import List, Optional, Callable, Tuple, Dict
 
 import flet as ft
 from flet_core import PopupMenuPosition, ControlEvent
 
 from xpense.database.repository_container import RepositoryContainer
+from xpense.database.sqlite_repository import DEFAULT_PAGE_SIZE
 from xpense.types import Transaction, Currency, TransactionType, TransactionOperations, \
     DataAggregation
 from xpense.utilities.common import round_to_two_decimals, human_readable_datetime
-from xpense.views.household.balance_calculator import BalanceCalculator
-from xpense.views.household.transaction_category_button import DEFAULT_EXPENSE_CATEGORIES_WITH_ICONS
+from xpense.utilities.throttle import Throttle
+from xpense.views.household.balance_calculator import BalanceCalculator, BalanceSnapshot
+from xpense.views.household.transaction_category_button import get_default_expense_categories_with_icons
 from xpense.views.household.transaction_fetcher import TransactionFetcher
-from xpense.views.household.transaction_view import get_transaction_view, TransactionPipe, CURRENCY_TO_ICONS
+from xpense.views.household.transaction_view import TransactionEditorView, TransactionPipe, get_currency_icons
+
+LOAD_MORE_SCROLL_EXTENT = 300  # Distance in pixels from the end of the list that loads the next page.
 
 
 def get_main_column() -> ft.Column:
@@ -42,8 +50,10 @@ class OverviewSection:
             self, repository_container: RepositoryContainer, current_datetime: datetime.datetime,
             data_aggregation: DataAggregation
     ):
+        self._rc = repository_container
         self._calculator = BalanceCalculator(repository_container, current_datetime)
         self._data_aggregation = data_aggregation
+        self._snapshot: BalanceSnapshot = self._calculator.get_snapshot(self._data_aggregation)
 
         self._expenses_amount = None
         self._income_amount = None
@@ -77,12 +87,10 @@ class OverviewSection:
             weight=ft.FontWeight.BOLD,
         )
 
-    def _set_amounts(self, data_aggregation: Optional[DataAggregation] = None):
-        if not data_aggregation:
-            data_aggregation = self._data_aggregation
-        self._expenses_amount_ref.current.value = f"€ {self._calculator.get_total_expenses(data_aggregation)}"
-        self._income_amount_ref.current.value = f"€ {self._calculator.get_total_income()}"
-        self._allocations_amount_ref.current.value = f"€ {self._calculator.get_total_allocations()}"
+    def _set_amounts(self):
+        self._expenses_amount_ref.current.value = f"€ {self._snapshot.expenses}"
+        self._income_amount_ref.current.value = f"€ {self._snapshot.income}"
+        self._allocations_amount_ref.current.value = f"€ {self._snapshot.allocations}"
 
     def _determine_first_column_container_label_text(self, data_aggregation: Optional[DataAggregation] = None):
         if not data_aggregation:
@@ -96,19 +104,17 @@ class OverviewSection:
             aggregation_label = "year"
         return f"Balance This {aggregation_label.title()}"
 
-    def _determine_first_column_total_balance_label_text(self, data_aggregation: Optional[DataAggregation] = None):
-        total_balance = self._calculator.get_total_balance(data_aggregation)
-        return f"€ {total_balance}"
+    def _determine_first_column_total_balance_label_text(self):
+        return f"€ {self._snapshot.balance}"
 
-    def on_data_aggregation_change(self, event: ControlEvent):
+    async def on_data_aggregation_change(self, event: ControlEvent):
         new_data_aggregation = DataAggregation.get_aggregation_type(event.control.text)
-        self._set_amounts(new_data_aggregation)
+        self._snapshot = await self._rc.async_transactions.run(self._calculator.get_snapshot, new_data_aggregation)
+        self._set_amounts()
         self._container_first_column_text_label_ref.current.value = self._determine_first_column_container_label_text(
             new_data_aggregation
         )
-        self._first_column_total_balance_text_label_ref.current.value = self._determine_first_column_total_balance_label_text(
-            new_data_aggregation
-        )
+        self._first_column_total_balance_text_label_ref.current.value = self._determine_first_column_total_balance_label_text()
 
     def _get_wallet_image_container(self) -> ft.Container:
         return ft.Container(
@@ -269,13 +275,14 @@ class DateSection:
             alignment=ft.alignment.center
         )
 
-    def _change_data_aggregation(self, event: ft.ControlEvent):
+    async def _change_data_aggregation(self, event: ft.ControlEvent):
         text = event.control.text
         self._data_aggregation = DataAggregation.get_aggregation_type(text).value.upper()
         self._data_aggregation_text.value = DataAggregation.get_aggregation_type(text).value.upper()
 
-        for callback in self._data_aggregation_change_callbacks:
-            callback(event)
+        # Async callbacks query the database concurrently, off the event loop.
+        results = [callback(event) for callback in self._data_aggregation_change_callbacks]
+        await asyncio.gather(*(result for result in results if inspect.isawaitable(result)))
 
         self._page.update()
 
@@ -284,11 +291,11 @@ class DateSection:
             icon=ft.icons.ARROW_DROP_DOWN,
             items=[
                 ft.PopupMenuItem(text=DataAggregation.MONTHLY.value.upper(),
-                                 on_click=lambda event: self._change_data_aggregation(event)),
+                                 on_click=self._change_data_aggregation),
                 ft.PopupMenuItem(text=DataAggregation.YEARLY.value.upper(),
-                                 on_click=lambda event: self._change_data_aggregation(event)),
+                                 on_click=self._change_data_aggregation),
                 ft.PopupMenuItem(text=DataAggregation.WEEKLY.value.upper(),
-                                 on_click=lambda event: self._change_data_aggregation(event)),
+                                 on_click=self._change_data_aggregation),
             ],
             menu_position=PopupMenuPosition.UNDER,
             enable_feedback=True
@@ -369,7 +376,8 @@ class FloatingButtonSection:
             self, page: ft.Page, repository_container: RepositoryContainer, current_date: datetime.datetime,
             setup_currency_type: Currency,
             transaction_type_tabs_section: TransactionTypeTabsSection,
-            transaction_list_view_section: "TransactionListViewSection"
+            transaction_list_view_section: "TransactionListViewSection",
+            transaction_editor_view: TransactionEditorView,
     ):
         self._page = page
         self._current_date = current_date
@@ -377,14 +385,10 @@ class FloatingButtonSection:
 
         self._transaction_list_view_section = transaction_list_view_section
         self._transaction_type_tabs_section = transaction_type_tabs_section
+        self._transaction_editor_view = transaction_editor_view
         self._transaction = self._get_default_transaction()
         self._transaction_pipe = TransactionPipe(transaction=self._transaction)
-        self._view = get_transaction_view(
-            page=self._page,
-            transaction_pipe=self._transaction_pipe,
-            back_button_callable=lambda _: self._click_go_back_button(),
-            save_transaction_button_callable=lambda _: self._click_save_button(),
-        )
+        self._view: Optional[ft.View] = None
 
         self._rc = repository_container
 
@@ -398,7 +402,7 @@ class FloatingButtonSection:
             on_click=lambda _: self._click_floating_button(),
         )
 
-    def _click_save_button(self):
+    async def _click_save_button(self, _: Optional[ControlEvent] = None):
         if not self._transaction.amount:
             self._transaction_pipe.transaction_section.amount_text_field.error_text = "Required"
             self._transaction_pipe.transaction_section.amount_container.bgcolor = ft.colors.YELLOW_100
@@ -410,12 +414,12 @@ class FloatingButtonSection:
             self._transaction_pipe.transaction_section.amount_container.bgcolor = ft.colors.WHITE
             self._transaction_pipe.transaction_section.main_container.update()
 
-        self._rc.transactions.add(self._transaction)
+        await self._rc.async_transactions.add(self._transaction)
+        self._transaction_list_view_section.on_transaction_saved(self._transaction)
         self._click_go_back_button()
 
     def _click_go_back_button(self):
         self._page.views.pop()
-        self._transaction_list_view_section.reset_list_view()
         self._page.update()
 
     def _click_floating_button(self):
@@ -435,11 +439,10 @@ class FloatingButtonSection:
     def _reset_transaction(self):
         self._transaction = self._get_default_transaction()
         self._transaction_pipe = TransactionPipe(transaction=self._transaction)
-        self._view = get_transaction_view(
-            page=self._page,
+        self._view = self._transaction_editor_view.bind(
             transaction_pipe=self._transaction_pipe,
             back_button_callable=lambda _: self._click_go_back_button(),
-            save_transaction_button_callable=lambda _: self._click_save_button(),
+            save_transaction_button_callable=self._click_save_button,
         )
 
     def get(self) -> ft.Container:
@@ -457,19 +460,20 @@ class TransactionEditContainer:
     def __init__(
             self,
             page: ft.Page,
-            repository_container: RepositoryContainer
+            repository_container: RepositoryContainer,
+            transaction_editor_view: TransactionEditorView,
     ):
         self._page = page
         self._rc = repository_container
+        self._transaction_editor_view = transaction_editor_view
 
         self._transaction_list_view_section: Optional[TransactionListViewSection] = None
 
     def _click_go_back_button(self):
         self._page.views.pop()
-        self._transaction_list_view_section.reset_list_view()
         self._page.update()
 
-    def _click_save_button(self, transaction_pipe: TransactionPipe):
+    async def _click_save_button(self, transaction_pipe: TransactionPipe, _: Optional[ControlEvent] = None):
         transaction = transaction_pipe.transaction
 
         if not transaction.amount:
@@ -483,25 +487,30 @@ class TransactionEditContainer:
             transaction_pipe.transaction_section.amount_container.bgcolor = ft.colors.WHITE
             transaction_pipe.transaction_section.main_container.update()
 
-        self._rc.transactions.update(transaction)
+        await self._rc.async_transactions.update(transaction)
+        self._transaction_list_view_section.on_transaction_saved(transaction)
         self._click_go_back_button()
 
-    def _click_delete_transaction_button(self, transaction_pipe: TransactionPipe):
+    async def _click_delete_transaction_button(
+            self, transaction_pipe: TransactionPipe, _: Optional[ControlEvent] = None
+    ):
         transaction = transaction_pipe.transaction
-        self._rc.transactions.delete(Transaction, transaction.id)
+        await self._rc.async_transactions.delete(Transaction, transaction.id)
+        self._transaction_list_view_section.on_transaction_deleted(transaction.id)
         self._click_go_back_button()
 
-    def on_click_edit_container(self, event: ControlEvent):
+    async def on_click_edit_container(self, event: ControlEvent):
         transaction_id = event.control.data
-        transaction = self._rc.transactions.get_by_id(Transaction, transaction_id)
+        transaction = await self._rc.async_transactions.get_by_id(Transaction, transaction_id)
         transaction_pipe = TransactionPipe(transaction=transaction)
 
-        view = get_transaction_view(
-            page=self._page,
+        view = self._transaction_editor_view.bind(
             transaction_pipe=transaction_pipe,
             back_button_callable=lambda _: self._click_go_back_button(),
-            save_transaction_button_callable=lambda _: self._click_save_button(transaction_pipe),
-            delete_transaction_button_callable=lambda _: self._click_delete_transaction_button(transaction_pipe),
+            save_transaction_button_callable=functools.partial(self._click_save_button, transaction_pipe),
+            delete_transaction_button_callable=functools.partial(
+                self._click_delete_transaction_button, transaction_pipe
+            ),
             transaction_operation=TransactionOperations.EDIT,
         )
         self._page.views.append(view)
@@ -511,106 +520,235 @@ class TransactionEditContainer:
         self._transaction_list_view_section = instance
 
 
+@dataclasses.dataclass
+class ListedTransactions:
+    """The transactions listed for a tab, newest first, with their row controls and keyset pagination state."""
+    transaction_type: TransactionType
+    data_aggregation: DataAggregation
+    generation: int  # Generation of the transactions repository the listing is up-to-date with.
+    transactions: List[Transaction] = dataclasses.field(default_factory=list)
+    controls: List[ft.Control] = dataclasses.field(default_factory=list)
+    rows: Dict[str, ft.Container] = dataclasses.field(default_factory=dict)
+    has_more: bool = True
+
+    @property
+    def last_transaction(self) -> Optional[Transaction]:
+        return self.transactions[-1] if self.transactions else None
+
+
 class TransactionListViewSection:
     def __init__(
             self, page: ft.Page, repository_container: RepositoryContainer,
             transaction_edit_container: TransactionEditContainer,
             data_aggregation: DataAggregation,
             current_datetime: datetime.datetime,
+            page_size: Optional[int] = DEFAULT_PAGE_SIZE,
     ):
         self._page = page
         self._rc = repository_container
         self._transaction_edit_container = transaction_edit_container
         self._transaction_fetcher = TransactionFetcher(repository_container, current_datetime)
+        self._page_size = page_size  # Transactions fetched per page as the list is scrolled.
 
         self._data_aggregation = data_aggregation
 
         self._list_view: Optional[ft.ListView] = None
         self._transaction_type_tabs_section: Optional[TransactionTypeTabsSection] = None
 
-    def on_data_aggregation_change(self, event: ControlEvent):
+        # Listings keyed by (transaction type, aggregation, period key), so that switching back to a tab
+        # reuses its rows instead of querying and building them again. Writes made through this section are
+        # applied to the current listing as single row changes, any other write makes the listings stale.
+        self._listings: Dict[Tuple[TransactionType, DataAggregation, str], ListedTransactions] = {}
+        self._listed: Optional[ListedTransactions] = None
+
+    async def on_data_aggregation_change(self, event: ControlEvent):
         transaction_type = self._get_current_transaction_type()
+        self._data_aggregation = DataAggregation.get_aggregation_type(event.control.text)
 
-        self._list_view.controls = []
-        self._populate_list_view(
-            self._list_view,
-            populate_transaction_type=transaction_type,
-            data_aggregation=DataAggregation.get_aggregation_type(event.control.text)
-        )
+        await self._populate_list_view_async(transaction_type, self._data_aggregation)
         self._list_view.update()
 
-    def on_tab_change(self, event: ControlEvent):
+    async def on_tab_change(self, event: ControlEvent):
         selected_tab = event.control.tabs[event.control.selected_index]
         selected_transaction_type = TransactionType.get_transaction_type(selected_tab.text)
-        self._list_view.controls = []
-        self._populate_list_view(self._list_view, selected_transaction_type)
+        await self._populate_list_view_async(selected_transaction_type, self._data_aggregation)
         self._list_view.update()
 
     def reset_list_view(self):
         transaction_type = self._get_current_transaction_type()
-        self._list_view.controls = []
-        self._populate_list_view(
-            self._list_view,
-            populate_transaction_type=transaction_type,
-            data_aggregation=self._data_aggregation
-        )
+        self._populate_list_view(transaction_type, self._data_aggregation)
 
     def get(self):
         if not self._list_view:
             self._list_view = ft.ListView(
                 spacing=1, padding=0, auto_scroll=False,
                 expand=True,
-                on_scroll=(lambda _: self._page.update())
+                on_scroll=Throttle(self._on_scroll),
             )
         self.reset_list_view()
         return self._list_view
 
+    def _get_listing_key(
+            self, transaction_type: TransactionType, data_aggregation: DataAggregation
+    ) -> Tuple[TransactionType, DataAggregation, str]:
+        return transaction_type, data_aggregation, self._transaction_fetcher.get_period_key(data_aggregation)
+
+    def _select_listing(
+            self, transaction_type: TransactionType, data_aggregation: DataAggregation
+    ) -> ListedTransactions:
+        """Makes the listing of the tab current, a new listing unless the cached one is up-to-date."""
+        generation = self._rc.transactions.generation
+        key = self._get_listing_key(transaction_type, data_aggregation)
+        listed = self._listings.get(key)
+        if listed is None or listed.generation != generation:
+            listed = ListedTransactions(transaction_type, data_aggregation, generation)
+            self._listings[key] = listed
+        self._listed = listed
+        return listed
+
     def _populate_list_view(
-            self, list_view: ft.ListView, populate_transaction_type: TransactionType,
+            self, populate_transaction_type: TransactionType,
             data_aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY
     ):
-        transactions: List[Transaction] = self._transaction_fetcher.get_by_type(
-            populate_transaction_type, data_aggregation
+        listed = self._select_listing(populate_transaction_type, data_aggregation)
+        if not listed.transactions and listed.has_more:
+            self._append_page(listed, self._fetch_next_page(listed))
+        self._show_listing(listed)
+
+    async def _populate_list_view_async(
+            self, populate_transaction_type: TransactionType,
+            data_aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY
+    ):
+        """Like `_populate_list_view`, with the first page fetched off the event loop."""
+        listed = self._select_listing(populate_transaction_type, data_aggregation)
+        if not listed.transactions and listed.has_more:
+            transactions = await self._rc.async_transactions.run(self._fetch_next_page, listed)
+            # Another handler may have loaded the page while this one was waiting for it.
+            if not listed.transactions:
+                self._append_page(listed, transactions)
+        self._show_listing(listed)
+
+    def _fetch_next_page(self, listed: ListedTransactions) -> List[Transaction]:
+        return self._transaction_fetcher.get_page_by_type(
+            listed.transaction_type, listed.data_aggregation,
+            after=listed.last_transaction, page_size=self._page_size,
         )
 
+    def _append_page(self, listed: ListedTransactions, transactions: List[Transaction]) -> bool:
+        """Appends a fetched page of transactions to the listing, returns whether any was appended."""
+        listed.has_more = len(transactions) == self._page_size
+        if not transactions:
+            return False
+
         for transaction in transactions:
-            list_view.controls.append(
-                ft.Container(
-                    alignment=ft.alignment.center_left,
-                    bgcolor=ft.colors.GREY_100,
-                    padding=ft.padding.only(left=10, right=10),
-                    height=60,
-                    content=ft.Row(
+            row = self._build_transaction_row(transaction)
+            listed.transactions.append(transaction)
+            listed.rows[transaction.id] = row
+            listed.controls.append(row)
+        self._show_listing(listed)
+        return True
+
+    def _show_listing(self, listed: ListedTransactions):
+        """
+        Shows the rows of the listing if it is the current one. The list view keeps a copy of the controls
+        it is given, so it is given them again after each change of the listing.
+        """
+        if listed is self._listed:
+            self._list_view.controls = listed.controls
+
+    def _remove_row(self, transaction_id: str):
+        listed = self._listed
+        row = listed.rows.pop(transaction_id, None)
+        if row is None:
+            return
+        listed.transactions = [t for t in listed.transactions if t.id != transaction_id]
+        listed.controls.remove(row)
+        self._show_listing(listed)
+
+    def _insert_row(self, transaction: Transaction):
+        # The list is ordered by (date, id), newest first, like the pages it is loaded from.
+        listed = self._listed
+        key = (transaction.date, transaction.id)
+        index = next(
+            (index for index, listed_transaction in enumerate(listed.transactions)
+             if (listed_transaction.date, listed_transaction.id) < key),
+            len(listed.transactions)
+        )
+        if index == len(listed.transactions) and listed.has_more:
+            # It belongs to a page that is not loaded yet, and will come with it.
+            return
+
+        row = self._build_transaction_row(transaction)
+        listed.transactions.insert(index, transaction)
+        listed.rows[transaction.id] = row
+        listed.controls.insert(index, row)
+        self._show_listing(listed)
+
+    def _keep_current_listing(self):
+        """After a write made through this section, keep the updated current listing and drop the stale ones."""
+        self._listed.generation = self._rc.transactions.generation
+        self._listings = {
+            key: listed for key, listed in self._listings.items() if listed is self._listed
+        }
+
+    def on_transaction_saved(self, transaction: Transaction):
+        """Applies an added or edited transaction to the list, without reloading the other rows."""
+        self._remove_row(transaction.id)
+        if self._transaction_fetcher.is_listed(
+                transaction, self._listed.transaction_type, self._listed.data_aggregation
+        ):
+            self._insert_row(dataclasses.replace(transaction))
+        self._keep_current_listing()
+
+    def on_transaction_deleted(self, transaction_id: str):
+        """Removes a deleted transaction from the list, without reloading the other rows."""
+        self._remove_row(transaction_id)
+        self._keep_current_listing()
+
+    def _on_scroll(self, event: ft.OnScrollEvent):
+        if not self._listed.has_more:
+            return
+        if event.pixels < event.max_scroll_extent - LOAD_MORE_SCROLL_EXTENT:
+            return
+        if self._append_page(self._listed, self._fetch_next_page(self._listed)):
+            self._list_view.update()
+
+    def _build_transaction_row(self, transaction: Transaction) -> ft.Container:
+        return ft.Container(
+            alignment=ft.alignment.center_left,
+            bgcolor=ft.colors.GREY_100,
+            padding=ft.padding.only(left=10, right=10),
+            height=60,
+            content=ft.Row(
+                controls=[
+                    ft.Row(
                         controls=[
-                            ft.Row(
-                                controls=[
-                                    ft.Icon(DEFAULT_EXPENSE_CATEGORIES_WITH_ICONS.get(transaction.category), size=40),
-                                    ft.Column(
-                                        controls=[ft.Text(value=transaction.category.title()),
-                                                  ft.Text(value=human_readable_datetime(transaction.date),
-                                                          size=10)],
-                                        spacing=0, alignment=ft.MainAxisAlignment.CENTER,
-                                    ),
-                                ]
-                            ),
-                            ft.Row(
-                                controls=[
-                                    ft.Icon(CURRENCY_TO_ICONS.get(transaction.currency), size=12,
-                                            color=ft.colors.RED_500),
-                                    ft.Text(value=round_to_two_decimals(transaction.amount), color=ft.colors.RED_500,
-                                            size=13),
-                                ],
-                                spacing=2, vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                                alignment=ft.alignment.center
+                            ft.Icon(get_default_expense_categories_with_icons().get(transaction.category), size=40),
+                            ft.Column(
+                                controls=[ft.Text(value=transaction.category.title()),
+                                          ft.Text(value=human_readable_datetime(transaction.date),
+                                                  size=10)],
+                                spacing=0, alignment=ft.MainAxisAlignment.CENTER,
                             ),
+                        ]
+                    ),
+                    ft.Row(
+                        controls=[
+                            ft.Icon(get_currency_icons().get(transaction.currency), size=12,
+                                    color=ft.colors.RED_500),
+                            ft.Text(value=round_to_two_decimals(transaction.amount), color=ft.colors.RED_500,
+                                    size=13),
                         ],
-                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        spacing=2, vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        alignment=ft.alignment.center
                     ),
-                    data=transaction.id,
-                    on_click=self._transaction_edit_container.on_click_edit_container,
-                )
-            )
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            data=transaction.id,
+            on_click=self._transaction_edit_container.on_click_edit_container,
+        )
 
     def set_transaction_type_tabs_section(self, instance: TransactionTypeTabsSection):
         self._transaction_type_tabs_section = instance
@@ -631,7 +769,11 @@ def get_main_container(
         data_aggregation: DataAggregation,
         current_date: datetime.datetime,
 ) -> ft.Container:
-    transaction_edit_container = TransactionEditContainer(page=page, repository_container=repository_container)
+    # The add and the edit flows open the same editor view, built once.
+    transaction_editor_view = TransactionEditorView(page)
+    transaction_edit_container = TransactionEditContainer(
+        page=page, repository_container=repository_container, transaction_editor_view=transaction_editor_view
+    )
     transaction_list_view_section = TransactionListViewSection(
         page=page, repository_container=repository_container, transaction_edit_container=transaction_edit_container,
         data_aggregation=data_aggregation, current_datetime=current_date
@@ -654,7 +796,8 @@ def get_main_container(
     floating_button_section = FloatingButtonSection(
         page, repository_container, current_date, setup_currency_type,
         transaction_type_tabs_section=transaction_type_tabs_section,
-        transaction_list_view_section=transaction_list_view_section
+        transaction_list_view_section=transaction_list_view_section,
+        transaction_editor_view=transaction_editor_view,
     )
 
     return ft.Container(
@@ -1,57 +1,66 @@
-from typing import Callable
+import functools
+from typing import Callable, Dict
 
 import flet as ft
 
 from xpense.types import Transaction, TransactionType
 
-DEFAULT_EXPENSE_CATEGORIES_WITH_ICONS = {
-    "grocery": ft.icons.LOCAL_GROCERY_STORE,
-    "transportation": ft.icons.DIRECTIONS_CAR,
-    "restaurant": ft.icons.RESTAURANT,
-    "healthcare": ft.icons.MEDICAL_SERVICES,
-    "entertainment": ft.icons.WEEKEND,
-    "clothing": ft.icons.SHOPPING_BAG_OUTLINED,
-    "travel": ft.icons.AIRPLANE_TICKET,
-    "education": ft.icons.SCHOOL,
-    "medical": ft.icons.MEDICAL_SERVICES,
-    "housing": ft.icons.HOME,
-    "shopping": ft.icons.SHOP,
-    "fitness": ft.icons.FITNESS_CENTER,
-    "technology": ft.icons.BIOTECH,
-    "car": ft.icons.LOCAL_CAR_WASH,
-    "rent": ft.icons.HOUSE,
-    "mortgage": ft.icons.HOME_REPAIR_SERVICE,
-    "pets": ft.icons.PETS,
-    "insurance": ft.icons.INTERESTS,
-    "car lease": ft.icons.CAR_RENTAL,
-    "personal loan": ft.icons.PERSON_ADD,
-    "business": ft.icons.BUSINESS,
-    "investments": ft.icons.BUSINESS_CENTER,
-    "donations": ft.icons.HIVE,
-    "gifts": ft.icons.CARD_GIFTCARD,
-    "lending": ft.icons.MONETIZATION_ON,
-    "other": ft.icons.OTHER_HOUSES,
-}
 
-DEFAULT_INCOME_CATEGORIES_WITH_ICONS = {
-    "salary": ft.icons.MONETIZATION_ON,
-    "business": ft.icons.BUSINESS,
-    "loan": ft.icons.PERSON_ADD,
-    "insurance": ft.icons.INTERESTS,
-    "rent": ft.icons.HOUSE,
-    "investments": ft.icons.BUSINESS_CENTER,
-    "donations": ft.icons.HIVE,
-    "child support": ft.icons.CHILD_CARE,
-    "childcare leave benefits": ft.icons.CHILD_FRIENDLY,
-    "tip": ft.icons.TIPS_AND_UPDATES,
-    "bonus": ft.icons.CABIN_SHARP,
-    "overtime": ft.icons.SETTINGS_OVERSCAN_ROUNDED,
-    "retirement": ft.icons.SPORTS_FOOTBALL,
-    "government benefits": ft.icons.MONEY_OFF_SHARP,
-    "passive income": ft.icons.INCOMPLETE_CIRCLE,
-    "scholarship": ft.icons.SCHOOL,
-    "other": ft.icons.OTHER_HOUSES,
-}
+@functools.cache
+def get_default_expense_categories_with_icons() -> Dict[str, str]:
+    """Returns the icon of each default expense category."""
+    return {
+        "grocery": ft.icons.LOCAL_GROCERY_STORE,
+        "transportation": ft.icons.DIRECTIONS_CAR,
+        "restaurant": ft.icons.RESTAURANT,
+        "healthcare": ft.icons.MEDICAL_SERVICES,
+        "entertainment": ft.icons.WEEKEND,
+        "clothing": ft.icons.SHOPPING_BAG_OUTLINED,
+        "travel": ft.icons.AIRPLANE_TICKET,
+        "education": ft.icons.SCHOOL,
+        "medical": ft.icons.MEDICAL_SERVICES,
+        "housing": ft.icons.HOME,
+        "shopping": ft.icons.SHOP,
+        "fitness": ft.icons.FITNESS_CENTER,
+        "technology": ft.icons.BIOTECH,
+        "car": ft.icons.LOCAL_CAR_WASH,
+        "rent": ft.icons.HOUSE,
+        "mortgage": ft.icons.HOME_REPAIR_SERVICE,
+        "pets": ft.icons.PETS,
+        "insurance": ft.icons.INTERESTS,
+        "car lease": ft.icons.CAR_RENTAL,
+        "personal loan": ft.icons.PERSON_ADD,
+        "business": ft.icons.BUSINESS,
+        "investments": ft.icons.BUSINESS_CENTER,
+        "donations": ft.icons.HIVE,
+        "gifts": ft.icons.CARD_GIFTCARD,
+        "lending": ft.icons.MONETIZATION_ON,
+        "other": ft.icons.OTHER_HOUSES,
+    }
+
+
+@functools.cache
+def get_default_income_categories_with_icons() -> Dict[str, str]:
+    """Returns the icon of each default income category."""
+    return {
+        "salary": ft.icons.MONETIZATION_ON,
+        "business": ft.icons.BUSINESS,
+        "loan": ft.icons.PERSON_ADD,
+        "insurance": ft.icons.INTERESTS,
+        "rent": ft.icons.HOUSE,
+        "investments": ft.icons.BUSINESS_CENTER,
+        "donations": ft.icons.HIVE,
+        "child support": ft.icons.CHILD_CARE,
+        "childcare leave benefits": ft.icons.CHILD_FRIENDLY,
+        "tip": ft.icons.TIPS_AND_UPDATES,
+        "bonus": ft.icons.CABIN_SHARP,
+        "overtime": ft.icons.SETTINGS_OVERSCAN_ROUNDED,
+        "retirement": ft.icons.SPORTS_FOOTBALL,
+        "government benefits": ft.icons.MONEY_OFF_SHARP,
+        "passive income": ft.icons.INCOMPLETE_CIRCLE,
+        "scholarship": ft.icons.SCHOOL,
+        "other": ft.icons.OTHER_HOUSES,
+    }
 
 
 def create_category_container(category_name: str, icon_name: ft.icons, on_click_func: Callable) -> ft.Container:
@@ -89,6 +98,10 @@ class TransactionCategoryButton:
             scrollable=True,
         )
 
+    def bind(self, transaction: Transaction):
+        """Makes the dialog choose the category of the transaction from now on."""
+        self._transaction = transaction
+
     def open_dialog(self, _: ft.ControlEvent):
         self._dialog_modal.content = self._get_content(self._transaction)
         self._page.open(self._dialog_modal)
@@ -103,12 +116,12 @@ class TransactionCategoryButton:
         if transaction.type == TransactionType.INCOME:
             controls = [
                 create_category_container(name, icon, self._click_category)
-                for name, icon in DEFAULT_INCOME_CATEGORIES_WITH_ICONS.items()
+                for name, icon in get_default_income_categories_with_icons().items()
             ]
         else:
             controls = [
                 create_category_container(name, icon, self._click_category)
-                for name, icon in DEFAULT_EXPENSE_CATEGORIES_WITH_ICONS.items()
+                for name, icon in get_default_expense_categories_with_icons().items()
             ]
         return ft.ListView(
             spacing=0,
@@ -1,9 +1,11 @@
 import datetime
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple, Any
 
 from dateutil.relativedelta import relativedelta
 
 from xpense.database.repository_container import RepositoryContainer
+from xpense.database.running_totals import get_period_key
+from xpense.database.sqlite_repository import DEFAULT_PAGE_SIZE
 from xpense.types import DataAggregation, Transaction, TransactionType
 
 
@@ -12,64 +14,99 @@ class TransactionFetcher:
         self._rc = repository_container
         self._current_datetime = current_datetime
 
-    def get_expense_transactions(
+    def get_period_bounds(
             self,
             aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY
-    ) -> List[Transaction]:
+    ) -> Tuple[datetime.datetime, datetime.datetime]:
+        """Returns the [start, end) datetimes of the current week, month or year."""
         if aggregation == DataAggregation.WEEKLY:
             current_week_start = self._current_datetime - datetime.timedelta(days=self._current_datetime.weekday())
             current_week_start = current_week_start.replace(hour=0, minute=0, second=0, microsecond=0)
             next_week_start = current_week_start + datetime.timedelta(weeks=1)
-            expense_transactions: List[Transaction] = self._rc.transactions.get_by_conditions(
-                conditions={
-                    ("type", "=", TransactionType.EXPENSE),
-                    ("date", '>=', current_week_start),
-                    ("date", '<', next_week_start),
-                },
-                logic='AND'
-            )
-
+            return current_week_start, next_week_start
         elif aggregation == DataAggregation.YEARLY:
             current_year = self._current_datetime.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
             next_year = current_year + relativedelta(years=1)
-            expense_transactions: List[Transaction] = self._rc.transactions.get_by_conditions(
-                conditions={
-                    ("type", "=", TransactionType.EXPENSE),
-                    ("date", '>=', current_year),
-                    ("date", '<', next_year),
-                },
-                logic='AND'
-            )
+            return current_year, next_year
         else:
             current_month = self._current_datetime.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             next_month = current_month + relativedelta(months=1)
-            expense_transactions: List[Transaction] = self._rc.transactions.get_by_conditions(
-                conditions={
-                    ("type", "=", TransactionType.EXPENSE),
-                    ("date", '>=', current_month),
-                    ("date", '<', next_month),
-                },
-                logic='AND'
-            )
+            return current_month, next_month
+
+    def get_conditions(
+            self, transaction_type: TransactionType,
+            aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY
+    ) -> Set[Tuple[str, str, Any]]:
+        """Returns the repository conditions selecting the transactions of the given type."""
+        if transaction_type == TransactionType.EXPENSE:
+            period_start, period_end = self.get_period_bounds(aggregation)
+            return {
+                ("type", "=", TransactionType.EXPENSE),
+                ("date", '>=', period_start),
+                ("date", '<', period_end),
+            }
+
+        # TODO: Add ending date for incomes and allocations because they may indeed have an end.
+        return {
+            ("type", "=", transaction_type),
+            # ("end_date", '<=', current_month),
+        }
+
+    def get_period_key(self, aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY) -> str:
+        """Returns the running totals key of the current week, month or year, e.g. 2024-W07."""
+        return get_period_key(aggregation.value, self._current_datetime)
+
+    def get_totals_conditions(
+            self, transaction_type: TransactionType,
+            aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY
+    ) -> Set[Tuple[str, str, Any]]:
+        """Returns the running totals conditions selecting the totals of the given type."""
+        if transaction_type == TransactionType.EXPENSE:
+            return {
+                ("type", "=", TransactionType.EXPENSE),
+                ("granularity", "=", aggregation),
+                ("period", "=", self.get_period_key(aggregation)),
+            }
+
+        # Incomes and allocations are not limited to a period, so any single granularity
+        # holds all of them, yearly being the one with the fewest rows.
+        return {
+            ("type", "=", transaction_type),
+            ("granularity", "=", DataAggregation.YEARLY),
+        }
+
+    def is_listed(
+            self, transaction: Transaction, transaction_type: TransactionType,
+            aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY
+    ) -> bool:
+        """Returns whether the transaction matches the conditions of the given type and aggregation."""
+        if transaction.type != transaction_type:
+            return False
+        if transaction_type != TransactionType.EXPENSE:
+            return True
+        period_start, period_end = self.get_period_bounds(aggregation)
+        return period_start <= transaction.date < period_end
+
+    def get_expense_transactions(
+            self,
+            aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY
+    ) -> List[Transaction]:
+        expense_transactions: List[Transaction] = self._rc.transactions.get_by_conditions(
+            conditions=self.get_conditions(TransactionType.EXPENSE, aggregation),
+            logic='AND'
+        )
         return expense_transactions
 
     def get_income_transactions(self) -> List[Transaction]:
-        # TODO: Add ending date for incomes because they may indeed have an end.
         income_transactions: List[Transaction] = self._rc.transactions.get_by_conditions(
-            conditions={
-                ("type", "=", TransactionType.INCOME),
-                # ("end_date", '<=', current_month),
-            },
+            conditions=self.get_conditions(TransactionType.INCOME),
             logic='AND'
         )
         return income_transactions
 
     def get_allocation_transactions(self) -> List[Transaction]:
         allocation_transactions: List[Transaction] = self._rc.transactions.get_by_conditions(
-            conditions={
-                ("type", "=", TransactionType.ALLOCATION),
-                # ("end_date", '<=', current_month),
-            },
+            conditions=self.get_conditions(TransactionType.ALLOCATION),
             logic='AND'
         )
         return allocation_transactions
@@ -84,3 +121,17 @@ class TransactionFetcher:
             return self.get_expense_transactions(aggregation=data_aggregation)
         else:
             return self.get_allocation_transactions()
+
+    def get_page_by_type(
+            self, transaction_type: TransactionType,
+            data_aggregation: Optional[DataAggregation] = DataAggregation.MONTHLY,
+            after: Optional[Transaction] = None,
+            page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+    ) -> List[Transaction]:
+        """Returns the next page of transactions of the given type, newest first, after the given transaction."""
+        return self._rc.transactions.get_page(
+            conditions=self.get_conditions(transaction_type, data_aggregation),
+            logic='AND',
+            after=(after.date, after.id) if after else None,
+            page_size=page_size,
+        )
@@ -1,6 +1,7 @@
 import dataclasses
 import datetime
-from typing import Callable, Optional
+import functools
+from typing import Callable, Optional, Dict
 
 import flet as ft
 
@@ -10,23 +11,35 @@ from xpense.utilities.common import round_to_two_decimals
 from xpense.utilities.household import keep_first_dot
 from xpense.views.household.transaction_category_button import TransactionCategoryButton
 
-CURRENCY_TO_ICONS = {
-    Currency.EURO: ft.icons.EURO,
-    Currency.DOLLAR: ft.icons.ATTACH_MONEY,
-    Currency.RON: ft.icons.MONEY
-}
+
+@functools.cache
+def get_currency_icons() -> Dict[Currency, str]:
+    """Returns the icon of each currency."""
+    return {
+        Currency.EURO: ft.icons.EURO,
+        Currency.DOLLAR: ft.icons.ATTACH_MONEY,
+        Currency.RON: ft.icons.MONEY
+    }
 
 
 class SegmentButton:
     def __init__(self, transaction: Transaction):
         self._transaction = transaction
         self._transaction_type = self._transaction.type
+        self._segment_button: Optional[ft.SegmentedButton] = None
+
+    def bind(self, transaction: Transaction):
+        """Shows the type of the transaction, which the selection changes from now on."""
+        self._transaction = transaction
+        self._transaction_type = self._transaction.type
+        if self._segment_button is not None:
+            self._segment_button.selected = {self._transaction_type.value}
 
     def _on_change(self, event: ft.ControlEvent):
         self._transaction.type = TransactionType.get_transaction_type(next(iter(event.control.selected)))
 
     def _get_segment_button(self) -> ft.SegmentedButton:
-        return ft.SegmentedButton(
+        self._segment_button = ft.SegmentedButton(
             on_change=lambda event: self._on_change(event),
             width=380,
             selected={self._transaction_type.value},
@@ -48,6 +61,7 @@ class SegmentButton:
             ],
             scale=0.9,
         )
+        return self._segment_button
 
     def get(self) -> ft.Container:
         return ft.Container(
@@ -61,26 +75,57 @@ class TransactionInputSection:
     def __init__(self, page: ft.Page, transaction_pipe: "TransactionPipe"):
         self._page = page
         self._transaction_pipe = transaction_pipe
-        self._transaction_pipe.transaction_section = self
         self._transaction = self._transaction_pipe.transaction
 
         self._current_date = self._transaction.date
         self.amount_text_field: Optional[ft.TextField] = None
         self.main_container: Optional[ft.Container] = None
         self.amount_container: Optional[ft.Container] = None
+        self._date_label: Optional[ft.Text] = None
+        self._currency_menu: Optional[ft.PopupMenuButton] = None
 
+        # The section is bound to each edited transaction in turn, so its single date picker is the only
+        # one it ever adds to the page overlay.
         self._date_picker = ft.DatePicker(
             on_change=lambda _: self._on_date_change(self._date_picker.value),
-            first_date=datetime.datetime.combine(self._current_date - datetime.timedelta(days=365), datetime.time()),
-            current_date=self._transaction.date,
         )
         self._page.overlay.append(self._date_picker)
 
         self._category_label_ref = ft.Ref[ft.Text]()
         self._category_button = TransactionCategoryButton(self._page, self._category_label_ref, self._transaction)
 
+        self.bind(transaction_pipe)
         # self._prepopulate_with_data_if_available_on_transaction()
 
+    def bind(self, transaction_pipe: "TransactionPipe"):
+        """Shows the transaction of the pipe, which the inputs edit from now on, without the previous errors."""
+        self._transaction_pipe = transaction_pipe
+        self._transaction_pipe.transaction_section = self
+        self._transaction = self._transaction_pipe.transaction
+        self._current_date = self._transaction.date
+
+        self._date_picker.first_date = datetime.datetime.combine(
+            self._current_date - datetime.timedelta(days=365), datetime.time()
+        )
+        self._date_picker.current_date = self._current_date
+        self._category_button.bind(self._transaction)
+
+        if self.main_container is None:
+            # Not built yet, the controls are built with the values of the transaction.
+            return
+        self._date_label.value = convert_datetime_to_string(self._current_date).split()[0]
+        self.amount_text_field.value = self._get_amount_text()
+        self.amount_text_field.error_text = None
+        self.amount_container.bgcolor = None
+        self._currency_menu.icon = self._get_currency_icon()
+        self._category_label_ref.current.value = self._transaction.category.title()
+
+    def _get_amount_text(self) -> str:
+        return "" if not self._transaction.amount else round_to_two_decimals(self._transaction.amount)
+
+    def _get_currency_icon(self) -> str:
+        return get_currency_icons().get(self._transaction.currency, ft.icons.EURO)
+
     def _prepopulate_with_data_if_available_on_transaction(self):
         self.amount_text_field.value = self._transaction.amount
         self.amount_text_field.update()
@@ -99,8 +144,9 @@ class TransactionInputSection:
         # Limit to 7 digits before the dot.
         amount = amount[:7]
 
-        # Update the text field.
-        self._transaction.amount = amount
+        # Update the text field, the transaction keeps the numeric amount
+        # (None while the text is empty or just a dot).
+        self._transaction.amount = float(amount) if amount.strip(".") else None
         self.amount_text_field.value = amount
         self.amount_text_field.update()
 
@@ -109,14 +155,14 @@ class TransactionInputSection:
         selected_currency = Currency.get_currency_type(selected_text)
         menu_button = event.control.parent
         self._transaction.currency = selected_currency
-        menu_button.icon = CURRENCY_TO_ICONS.get(selected_currency)
+        menu_button.icon = get_currency_icons().get(selected_currency)
         menu_button.update()
 
     def _build_input_amount_text_field(self) -> ft.TextField:
         if self.amount_text_field is None:
             self.amount_text_field = ft.TextField(
                 # bgcolor=ft.colors.BLACK,
-                value="" if not self._transaction.amount else round_to_two_decimals(self._transaction.amount),
+                value=self._get_amount_text(),
                 adaptive=True,
                 on_change=lambda event: self._on_text_field_change(event),
                 border=ft.InputBorder.NONE,
@@ -135,6 +181,7 @@ class TransactionInputSection:
         return self.amount_text_field
 
     def get_date_container(self) -> ft.Container:
+        self._date_label = ft.Text(convert_datetime_to_string(self._current_date).split()[0])
         return ft.Container(
             # bgcolor=ft.colors.BLUE,
             content=ft.Row(
@@ -143,7 +190,7 @@ class TransactionInputSection:
                 controls=[
                     ft.Text("Date", weight=ft.FontWeight.BOLD),
                     ft.Container(
-                        content=ft.Text(convert_datetime_to_string(self._current_date).split()[0]),
+                        content=self._date_label,
                         on_click=lambda _: self._date_picker.pick_date())
                 ],
                 spacing=0,
@@ -151,8 +198,8 @@ class TransactionInputSection:
         )
 
     def _get_currency_pop_menu(self):
-        return ft.PopupMenuButton(
-            icon=ft.icons.EURO,
+        self._currency_menu = ft.PopupMenuButton(
+            icon=self._get_currency_icon(),
             items=[
                 ft.PopupMenuItem(text=Currency.RON.value, on_click=self._on_currency_change),
                 ft.PopupMenuItem(text=Currency.EURO.value, on_click=self._on_currency_change),
@@ -163,6 +210,7 @@ class TransactionInputSection:
             icon_size=14,
             width=14,
         )
+        return self._currency_menu
 
     def get_amount_container(self) -> ft.Container:
         if not self.amount_container:
@@ -238,22 +286,23 @@ class TransactionViewAppBar:
             back_button_callable: Callable,
             delete_transaction_button_callable: Optional[Callable] = None
     ):
-        self._back_button_callable = back_button_callable
-        self._delete_transaction_button_callable = delete_transaction_button_callable
+        self._back_button = ft.IconButton(icon=ft.icons.ARROW_BACK, icon_color=ft.colors.WHITE)
+        self._delete_button = ft.IconButton(icon=ft.icons.DELETE, icon_color=ft.colors.WHITE)
+        self.bind(back_button_callable, delete_transaction_button_callable)
+
+    def bind(self, back_button_callable: Callable, delete_transaction_button_callable: Optional[Callable] = None):
+        """Sets the actions of the buttons, the delete button is only shown with one."""
+        self._back_button.on_click = back_button_callable
+        self._delete_button.on_click = delete_transaction_button_callable
+        self._delete_button.visible = delete_transaction_button_callable is not None
 
     def get(self) -> ft.BottomAppBar:
         app_bar_controls = [
-            ft.IconButton(icon=ft.icons.ARROW_BACK, icon_color=ft.colors.WHITE,
-                          on_click=self._back_button_callable),
+            self._back_button,
             ft.Container(expand=True),
+            self._delete_button,
         ]
 
-        if self._delete_transaction_button_callable:
-            app_bar_controls.append(
-                ft.IconButton(icon=ft.icons.DELETE, icon_color=ft.colors.WHITE,
-                              on_click=self._delete_transaction_button_callable),
-            )
-
         return ft.BottomAppBar(
             bgcolor=ft.colors.BLUE,
             shape=ft.NotchShape.CIRCULAR,
@@ -264,63 +313,97 @@ class TransactionViewAppBar:
         )
 
 
-def get_transaction_view(
-        page: ft.Page,
-        transaction_pipe: TransactionPipe,
-        back_button_callable: Callable,
-        save_transaction_button_callable: Callable,
-        delete_transaction_button_callable: Optional[Callable] = None,
-        transaction_operation: Optional[TransactionOperations] = TransactionOperations.ADD,
-) -> ft.View:
-    transaction_view_appbar = TransactionViewAppBar(
-        back_button_callable=back_button_callable,
-        delete_transaction_button_callable=delete_transaction_button_callable,
-    )
-    if transaction_operation == TransactionOperations.ADD:
-        transaction_view_headline = "Add transaction"
-    else:
-        transaction_view_headline = "Edit transaction"
-
-    return ft.View(
-        controls=[
-            ft.Container(
-                alignment=ft.alignment.top_left,
-                expand=True,
-                padding=ft.padding.only(left=10),
-                bgcolor=ft.colors.WHITE70,
-                content=ft.Column(
-                    controls=[
-                        ft.Row(
-                            controls=[
-                                ft.Text(transaction_view_headline, size=18, color=ft.colors.BLUE_600,
-                                        theme_style=ft.TextThemeStyle.TITLE_MEDIUM),
-                                ft.IconButton(
-                                    icon=ft.icons.CLOSE,
-                                    on_click=back_button_callable
-                                )
-                            ],
-                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
-                        ),
-                        SegmentButton(transaction_pipe.transaction).get(),
-                        ft.Divider(leading_indent=20, trailing_indent=20),
-                        TransactionInputSection(page, transaction_pipe).get(),
-                        ft.Divider(leading_indent=20, trailing_indent=20),
-                    ],
-                    spacing=0,
-                ),
-            )
+class TransactionEditorView:
+    """
+    The view adding or editing a transaction. It is built on the first opening and bound to the transaction
+    of each later one, so that opening the editor builds no control, and adds nothing to the page overlay.
+    """
 
-        ],
-        bgcolor=ft.colors.WHITE,
-        bottom_appbar=transaction_view_appbar.get(),
-        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-        vertical_alignment=ft.MainAxisAlignment.CENTER,
-        floating_action_button=ft.FloatingActionButton(
+    def __init__(self, page: ft.Page):
+        self._page = page
+        self._view: Optional[ft.View] = None
+        self._headline: Optional[ft.Text] = None
+        self._close_button: Optional[ft.IconButton] = None
+        self._save_button: Optional[ft.FloatingActionButton] = None
+        self._segment_button: Optional[SegmentButton] = None
+        self._transaction_input_section: Optional[TransactionInputSection] = None
+        self._transaction_view_appbar: Optional[TransactionViewAppBar] = None
+
+    def bind(
+            self,
+            transaction_pipe: TransactionPipe,
+            back_button_callable: Callable,
+            save_transaction_button_callable: Callable,
+            delete_transaction_button_callable: Optional[Callable] = None,
+            transaction_operation: Optional[TransactionOperations] = TransactionOperations.ADD,
+    ) -> ft.View:
+        """Returns the view, showing the transaction of the pipe and calling the given button actions."""
+        if self._view is None:
+            self._build(transaction_pipe, back_button_callable, delete_transaction_button_callable)
+        else:
+            self._segment_button.bind(transaction_pipe.transaction)
+            self._transaction_input_section.bind(transaction_pipe)
+            self._transaction_view_appbar.bind(back_button_callable, delete_transaction_button_callable)
+
+        if transaction_operation == TransactionOperations.ADD:
+            self._headline.value = "Add transaction"
+        else:
+            self._headline.value = "Edit transaction"
+        self._close_button.on_click = back_button_callable
+        self._save_button.on_click = save_transaction_button_callable
+        return self._view
+
+    def _build(
+            self,
+            transaction_pipe: TransactionPipe,
+            back_button_callable: Callable,
+            delete_transaction_button_callable: Optional[Callable] = None,
+    ):
+        self._transaction_view_appbar = TransactionViewAppBar(
+            back_button_callable=back_button_callable,
+            delete_transaction_button_callable=delete_transaction_button_callable,
+        )
+        self._segment_button = SegmentButton(transaction_pipe.transaction)
+        self._transaction_input_section = TransactionInputSection(self._page, transaction_pipe)
+        self._headline = ft.Text(size=18, color=ft.colors.BLUE_600, theme_style=ft.TextThemeStyle.TITLE_MEDIUM)
+        self._close_button = ft.IconButton(icon=ft.icons.CLOSE)
+        self._save_button = ft.FloatingActionButton(
             icon=ft.icons.CHECK,
             bgcolor=ft.colors.AMBER_300,
             shape=ft.RoundedRectangleBorder(radius=40),
             scale=1,
-            on_click=save_transaction_button_callable,
-        ),
-        floating_action_button_location=ft.FloatingActionButtonLocation.CENTER_DOCKED,
-    )
+        )
+
+        self._view = ft.View(
+            controls=[
+                ft.Container(
+                    alignment=ft.alignment.top_left,
+                    expand=True,
+                    padding=ft.padding.only(left=10),
+                    bgcolor=ft.colors.WHITE70,
+                    content=ft.Column(
+                        controls=[
+                            ft.Row(
+                                controls=[
+                                    self._headline,
+                                    self._close_button,
+                                ],
+                                alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+                            ),
+                            self._segment_button.get(),
+                            ft.Divider(leading_indent=20, trailing_indent=20),
+                            self._transaction_input_section.get(),
+                            ft.Divider(leading_indent=20, trailing_indent=20),
+                        ],
+                        spacing=0,
+                    ),
+                )
+
+            ],
+            bgcolor=ft.colors.WHITE,
+            bottom_appbar=self._transaction_view_appbar.get(),
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            vertical_alignment=ft.MainAxisAlignment.CENTER,
+            floating_action_button=self._save_button,
+            floating_action_button_location=ft.FloatingActionButtonLocation.CENTER_DOCKED,
+        )
@@ -1,18 +1,35 @@
-from typing import Optional
+from typing import Optional, Callable
 
 import flet as ft
 import flet_route
 
-from xpense.views.calendar.controls import get_calendar_controls
-from xpense.views.household.household_controls import get_household_controls
-from xpense.types import flet_route_callable_type, Routes
+from xpense.types import flet_route_callable_type
 
 
-def get_view(route_url: str, controls: Optional[list[ft.Control]] = None) -> flet_route_callable_type:
+def get_view(
+        route_url: str,
+        controls: Optional[list[ft.Control]] = None,
+        controls_factory: Optional[Callable[[], list[ft.Control]]] = None,
+        on_show: Optional[Callable[[], None]] = None,
+) -> flet_route_callable_type:
+    """
+    Returns the view of a route. Controls given by a factory are only built when the route is first shown,
+    and reused afterwards, so views that are never visited cost nothing at startup. `on_show` is called
+    each time the route is shown, once the controls are built, to bring reused controls up to date.
+    """
+    def get_controls() -> Optional[list[ft.Control]]:
+        nonlocal controls
+        if controls is None and controls_factory is not None:
+            controls = controls_factory()
+        return controls
+
     def get_main_view(page: ft.Page, params: flet_route.Params, basket: flet_route.Basket) -> ft.View:
+        view_controls = get_controls()
+        if on_show is not None:
+            on_show()
         return ft.View(
             route=route_url,
-            controls=controls,
+            controls=view_controls,
             vertical_alignment=ft.MainAxisAlignment.CENTER,
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
             bgcolor=ft.colors.WHITE70,